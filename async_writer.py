@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import parallel
+from config import ENGINE
+from engine_profile import engine_options
+from writers import DatabaseWriter
+
+
+# asyncio drivers by backend, used unless [engine] async_driver names another.
+ASYNC_DRIVERS = {
+    "mysql": "asyncmy",
+    "mariadb": "asyncmy",
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def async_url(url, driver=None):
+    """Returns the URL with its driver swapped for an asyncio one."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    driver = driver or ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No asyncio driver known for {backend}; set async_driver under [engine].")
+    return url.set(drivername=f"{backend}+{driver}")
+
+
+class AsyncDatabaseWriter(DatabaseWriter):
+    """Inserts batches from concurrent writer tasks on a SQLAlchemy AsyncEngine.
+
+    An event loop on a background thread runs `writers` tasks that drain a
+    queue of at most `queue_size` batches, one transaction per batch, while
+    the caller keeps generating rows. write() blocks while the queue is
+    full, so memory stays bounded. A batch waits for the earlier batches of
+    every table it references, so foreign keys always point at stored rows.
+    Tables are created and constraints finalized on the synchronous engine.
+    """
+
+    def __init__(self, engine, writers=4, queue_size=8, defer_constraints=False, profile=ENGINE):
+        super().__init__(engine, defer_constraints)
+        if not parallel.supports_parallel(engine):
+            raise ValueError("Async output needs a database file or server, not in-memory SQLite.")
+        self.writers = writers
+        self.queue_size = queue_size
+        self.profile = profile
+        self.batches = 0
+        self.blocked_seconds = 0.0
+        self._loop = None
+        self._thread = None
+        self._async_engine = None
+        self._queue = None
+        self._tasks = []
+        self._submitted = defaultdict(list)
+
+    def open(self, tables):
+        super().open(tables)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._call(self._start())
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _start(self):
+        url = async_url(self.engine.url, self.profile.get("async_driver"))
+        self._async_engine = create_async_engine(url, **engine_options(url, self.profile))
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._drain()) for _ in range(self.writers)]
+
+    def write(self, table, rows):
+        if not rows:
+            return
+        started = time.perf_counter()
+        self._call(self._submit(table, list(rows)))
+        self.blocked_seconds += time.perf_counter() - started
+        self.batches += 1
+
+    async def _submit(self, table, rows):
+        parents = {fk.column.table for fk in table.foreign_keys}
+        waits = []
+        for parent in parents:
+            batches = self._submitted[parent]
+            for batch in batches:
+                if batch.done() and batch.exception() is not None:
+                    raise batch.exception()
+            batches[:] = [batch for batch in batches if not batch.done()]
+            waits.extend(batches)
+        done = self._loop.create_future()
+        self._submitted[table].append(done)
+        await self._queue.put((table, rows, waits, done))
+
+    async def _drain(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                if item is None:
+                    return
+                table, rows, waits, done = item
+                try:
+                    await asyncio.gather(*waits)
+                    async with self._async_engine.begin() as connection:
+                        await connection.execute(insert(table), rows)
+                    done.set_result(None)
+                except Exception as error:
+                    done.set_exception(error)
+            finally:
+                self._queue.task_done()
+
+    async def _finish(self):
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+        await self._async_engine.dispose()
+        for batches in self._submitted.values():
+            for batch in batches:
+                if batch.exception() is not None:
+                    raise batch.exception()
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            self._call(self._finish())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+        print(
+            f"Inserted {self.batches} batches on {self.writers} async writers; "
+            f"generation waited {self.blocked_seconds:.2f}s on a full queue."
+        )
+        super().close()
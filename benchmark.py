@@ -0,0 +1,256 @@
+"""Seeding throughput benchmark.
+
+Runs the seeder at several data_generation_size values against SQLite
+(in-memory and on disk) and writes a JSON report with wall time, rows/sec,
+queries issued and memory growth for every phase, the same numbers for
+every factory that ran in it, plus totals per run. Each run is a separate
+process with its own config.toml, so runs never share state.
+
+    python benchmark.py --sizes 1000 10000 100000 --output benchmark.json
+    python benchmark.py --sizes 1000 --compare benchmark.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import toml
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASES = {
+    "memory": lambda directory: "sqlite://",
+    "file": lambda directory: f"sqlite:///{os.path.join(directory, 'benchmark.db')}",
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def factory_metrics(snapshot):
+    """Per-factory creates, seconds and queries from an instrumentation snapshot.
+
+    Seconds include the SubFactories a factory creates; rows built without
+    _create, e.g. by the user pipeline, are not counted.
+    """
+    if snapshot is None:
+        return {}
+    queries, db_time, calls, call_time, _ = snapshot
+    metrics = {}
+    for name, count in calls.items():
+        if not name.endswith("._create"):
+            continue
+        factory_name = name[: -len("._create")]
+        seconds = call_time[name]
+        metrics[factory_name] = {
+            "creates": count,
+            "seconds": round(seconds, 4),
+            "creates_per_sec": round(count / seconds, 1) if seconds else None,
+            "queries": queries.get(factory_name, 0),
+            "db_seconds": round(db_time.get(factory_name, 0.0), 4),
+        }
+    return metrics
+
+
+def run_phases(result_path):
+    """Seeds the configured database serially, measuring every task. Runs in the child."""
+    from sqlalchemy import event, func, select
+
+    import factories
+    import scheduler
+    import seed
+    from config import DATA_GENERATION_SIZE
+    from database import Base, SessionLocal, engine
+    from instrumentation import stats
+
+    queries = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries[0] += 1
+
+    def row_counts(session, tables):
+        return {
+            table.name: session.execute(select(func.count()).select_from(table)).scalar()
+            for table in tables
+        }
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    factories.bind_session(session)
+    stats.drain()
+
+    phases = []
+    started = time.perf_counter()
+    for task in seed.seeding_tasks(DATA_GENERATION_SIZE):
+        tables = sorted(task.tables, key=lambda table: table.name)
+        before = row_counts(session, tables)
+        queries_before = queries[0]
+        peak_before = peak_rss_mb()
+        elapsed = scheduler.run_task(task, session)
+        peak_after = peak_rss_mb()
+        issued = queries[0] - queries_before
+        after = row_counts(session, tables)
+        rows = {name: after[name] - before[name] for name in after}
+        total_rows = sum(rows.values())
+        phases.append(
+            {
+                "name": task.name,
+                "seconds": round(elapsed, 4),
+                "rows": rows,
+                "rows_per_sec": round(total_rows / elapsed, 1) if elapsed else None,
+                "queries": issued,
+                # How far the phase raised the process's high-water mark.
+                "peak_rss_growth_mb": round(peak_after - peak_before, 1),
+                "cumulative_peak_rss_mb": round(peak_after, 1),
+                "factories": factory_metrics(stats.drain()),
+            }
+        )
+    wall = time.perf_counter() - started
+    session.close()
+
+    total_rows = sum(sum(phase["rows"].values()) for phase in phases)
+    result = {
+        "size": DATA_GENERATION_SIZE,
+        "seconds": round(wall, 4),
+        "rows": total_rows,
+        "rows_per_sec": round(total_rows / wall, 1) if wall else None,
+        "queries": sum(phase["queries"] for phase in phases),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "phases": phases,
+    }
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+
+
+def run_size(size, database):
+    """Runs one benchmark in a child process inside a scratch directory."""
+    with open(os.path.join(REPO_DIR, "config.toml")) as f:
+        settings = toml.load(f)
+    with tempfile.TemporaryDirectory(prefix="seed-bench-") as directory:
+        settings.update(
+            data_generation_size=size,
+            database_connection_string=DATABASES[database](directory),
+            output="database",
+            append=False,
+            # Instrumentation scopes give the per-factory numbers.
+            instrument=True,
+            workers=1,
+            scheduler_workers=1,
+            faker_pool_dir=os.path.join(REPO_DIR, settings.get("faker_pool_dir", ".faker_pools")),
+        )
+        with open(os.path.join(directory, "config.toml"), "w") as f:
+            toml.dump(settings, f)
+
+        result_path = os.path.join(directory, "result.json")
+        env = dict(os.environ, PYTHONPATH=REPO_DIR)
+        with open(os.path.join(directory, "seed.log"), "w") as log:
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", result_path],
+                cwd=directory,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        if process.returncode != 0:
+            with open(os.path.join(directory, "seed.log")) as log:
+                print(log.read()[-2000:])
+            raise RuntimeError(f"Benchmark run failed for size {size} on {database}.")
+        with open(result_path) as f:
+            result = json.load(f)
+    result["database"] = database
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, threshold):
+    """Prints phases whose rows/sec dropped by more than `threshold` against a baseline report."""
+    previous = {
+        (run["database"], run["size"], phase["name"]): phase
+        for run in baseline["runs"]
+        for phase in run["phases"]
+    }
+    regressions = 0
+    for run in report["runs"]:
+        for phase in run["phases"]:
+            old = previous.get((run["database"], run["size"], phase["name"]))
+            if not old or not old["rows_per_sec"] or not phase["rows_per_sec"]:
+                continue
+            change = phase["rows_per_sec"] / old["rows_per_sec"] - 1
+            if change < -threshold:
+                regressions += 1
+                print(
+                    f"REGRESSION {run['database']} size={run['size']} {phase['name']}: "
+                    f"{old['rows_per_sec']:,.0f} -> {phase['rows_per_sec']:,.0f} rows/s "
+                    f"({change:+.0%})"
+                )
+    print(f"{regressions} regressions against {baseline.get('revision') or 'baseline'}.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--databases", nargs="+", choices=DATABASES, default=list(DATABASES))
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="baseline report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_phases(args.child)
+        return
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    for database in args.databases:
+        for size in args.sizes:
+            print(f"Benchmarking size {size} on {database} SQLite...")
+            run = run_size(size, database)
+            report["runs"].append(run)
+            print(
+                f"  {run['rows']} rows in {run['seconds']:.2f}s "
+                f"({run['rows_per_sec']:,.0f} rows/s, {run['queries']} queries, "
+                f"peak {run['peak_rss_mb']:.0f} MB)"
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import insert, select
+
+import models
+from database import Base
+from key_pool import key_pools
+from sampling import sample_unique_pairs
+from scale import degree_spec, key_weights, sample_weighted_pairs
+
+
+# Generators for the non-key columns of link tables, called as fn(rng, n).
+LINK_EXTRA_COLUMNS = {
+    models.IdeaVote: {"type": lambda rng, n: rng.random(n) < 0.5},
+}
+
+
+def _model_for_table(table):
+    for mapper in Base.registry.mappers:
+        if mapper.local_table is table:
+            return mapper.class_
+    return None
+
+
+def link_columns(model):
+    """Returns [(column, parent_model), ...] for a composite-PK link table, else None."""
+    table = model.__table__
+    key_columns = list(table.primary_key.columns)
+    if len(key_columns) != 2:
+        return None
+    links = []
+    for column in key_columns:
+        if len(column.foreign_keys) != 1:
+            return None
+        parent = _model_for_table(next(iter(column.foreign_keys)).column.table)
+        if parent is None:
+            return None
+        links.append((column, parent))
+    return links
+
+
+def is_link_model(model):
+    return link_columns(model) is not None
+
+
+@contextmanager
+def skewed_foreign_keys(model, rng):
+    """Weights the key pools behind the model's [scale.degrees] columns while seeding it.
+
+    Factories draw those foreign keys with get_random_id(), which then
+    samples each parent key in proportion to its weight. Keys added to a
+    pool meanwhile get the mean weight.
+    """
+    pools = []
+    for column in model.__table__.columns:
+        spec = degree_spec(model.__tablename__, column.name)
+        if spec is None or len(column.foreign_keys) != 1:
+            continue
+        parent = _model_for_table(next(iter(column.foreign_keys)).column.table)
+        if parent is None:
+            continue
+        pool = key_pools.pool(parent)
+        weights = key_weights(spec, len(pool.keys), rng)
+        if weights is None:
+            continue
+        by_key = dict(zip(pool.keys, weights.tolist()))
+        mean = 1.0 / len(by_key)
+        pool.set_weights(lambda key, by_key=by_key, mean=mean: by_key.get(key, mean))
+        pools.append(pool)
+    try:
+        yield
+    finally:
+        for pool in pools:
+            pool.set_weights(None)
+
+
+def existing_link_keys(model, session):
+    """Returns the (left key, right key) pairs already stored in a link table."""
+    (left_column, _), (right_column, _) = link_columns(model)
+    return session.execute(select(left_column, right_column)).all()
+
+
+def draw_link_keys(model, num, rng, existing=None):
+    """Draws up to `num` distinct key pairs for a link table as {column name: key list}.
+
+    Pairs in `existing`, e.g. from existing_link_keys(), are never drawn.
+    Columns with a [scale.degrees] distribution pick their keys with that
+    skew; otherwise every pair is equally likely.
+    """
+    (left_column, left_model), (right_column, right_model) = link_columns(model)
+    left_pool = key_pools.pool(left_model)
+    right_pool = key_pools.pool(right_model)
+    left_keys = np.asarray(left_pool.keys)
+    right_keys = np.asarray(right_pool.keys)
+
+    exclude = None
+    if existing:
+        pairs = [
+            (left_pool.position(left), right_pool.position(right))
+            for left, right in existing
+        ]
+        pairs = [pair for pair in pairs if None not in pair]
+        exclude = ([left for left, _ in pairs], [right for _, right in pairs])
+
+    left_spec = degree_spec(model.__tablename__, left_column.name)
+    right_spec = degree_spec(model.__tablename__, right_column.name)
+    if left_spec or right_spec:
+        left_idx, right_idx = sample_weighted_pairs(
+            key_weights(left_spec, len(left_keys), rng),
+            key_weights(right_spec, len(right_keys), rng),
+            len(left_keys),
+            len(right_keys),
+            num,
+            rng,
+            exclude=exclude,
+        )
+    else:
+        left_idx, right_idx = sample_unique_pairs(
+            len(left_keys), len(right_keys), num, rng, exclude=exclude
+        )
+    return {
+        left_column.name: left_keys[left_idx].tolist(),
+        right_column.name: right_keys[right_idx].tolist(),
+    }
+
+
+def build_link_rows(model, num, rng=None, existing=None):
+    """Generates up to `num` unique rows for a link table from the key pools."""
+    rng = rng if rng is not None else np.random.default_rng()
+    columns = draw_link_keys(model, num, rng, existing)
+    count = len(next(iter(columns.values())))
+    for name, generate in LINK_EXTRA_COLUMNS.get(model, {}).items():
+        columns[name] = generate(rng, count).tolist()
+
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def bulk_create_links(model, num, session, rng=None, existing=None):
+    """Inserts up to `num` unique link rows with a single executemany."""
+    rows = build_link_rows(model, num, rng, existing)
+    if rows:
+        session.execute(insert(model.__table__), rows)
+    if len(rows) < num:
+        print(
+            f"Warning: Only {len(rows)}/{num} unique {model.__name__} key pairs exist."
+        )
+    else:
+        print(f"Bulk inserted {len(rows)} {model.__name__} rows.")
+    return len(rows)
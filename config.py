@@ -10,8 +10,44 @@ except FileNotFoundError:
 
 DB_CONNECTION_STRING = config.get("database_connection_string")
 DATA_GENERATION_SIZE = config.get("data_generation_size", 50)
+BULK_LINK_TABLES = config.get("bulk_link_tables", False)
+CHUNK_SIZE = config.get("chunk_size", 1000)
+WORKERS = config.get("workers", 1)
+SCHEDULER_WORKERS = config.get("scheduler_workers", 1)
+SEED = config.get("seed")
+APPEND = config.get("append", False)
+DEFER_CONSTRAINTS = config.get("defer_constraints", False)
+INSTRUMENT = config.get("instrument", False)
+PROFILE_OUTPUT = config.get("profile_output")
+STAGING = config.get("staging", False)
+PIPELINED = config.get("pipelined", False)
+PIPELINE_QUEUE_SIZE = config.get("pipeline_queue_size", 4)
+TIMESERIES_DAYS = config.get("timeseries_days", 90)
+ACTIVITY_RATE = config.get("activity_rate", 0.5)
+NOTIFICATIONS_PER_USER = config.get("notifications_per_user", 5)
+# Per-table row counts and per-column degree distributions from [scale].
+SCALE = config.get("scale", {})
+# Driver, pool, executemany and transaction settings from the [engine] table.
+ENGINE = config.get("engine", {})
+COMMIT_EVERY = ENGINE.get("commit_every", 0)
+REFERENCE_DATE = config.get("reference_date")
+CONNECTION_DEGREE = config.get("connection_degree", 1)
+CONNECTION_TYPES = config.get("connection_types", ["Partnership"])
+OUTPUT = config.get("output", "database")
+OUTPUT_DIR = config.get("output_dir", "output")
+ASYNC_WRITERS = config.get("async_writers", 4)
+ASYNC_QUEUE_SIZE = config.get("async_queue_size", 8)
+FAKER_POOLS = config.get("faker_pools", False)
+FAKER_POOL_SIZE = config.get("faker_pool_size", 10000)
+FAKER_POOL_DIR = config.get("faker_pool_dir", ".faker_pools")
+PASSWORD_HASHES = config.get("password_hashes", "random")
+PASSWORD_POOL = config.get("password_pool", [])
+PASSWORD_POOL_EVERY = config.get("password_pool_every", 100)
+PASSWORD_POOL_SIZE = config.get("password_pool_size", 8)
+SNAPSHOT = config.get("snapshot", False)
+SNAPSHOT_DIR = config.get("snapshot_dir", ".snapshots")
 
-if not DB_CONNECTION_STRING:
+if OUTPUT in ("database", "load", "async") and not DB_CONNECTION_STRING:
     raise ValueError(
         "Database connection string not found. Please set it in 'config.toml' "
         "or as a DB_CONNECTION_STRING environment variable."
@@ -0,0 +1,122 @@
+import time
+from collections import Counter
+
+from sqlalchemy import MetaData, UniqueConstraint, select
+from sqlalchemy.schema import AddConstraint, CreateIndex, CreateTable
+
+from engine_profile import scan_options
+
+
+def unique_constraints(table):
+    return sorted(
+        (c for c in table.constraints if isinstance(c, UniqueConstraint)),
+        key=lambda c: [column.name for column in c.columns],
+    )
+
+
+def create_tables_deferred(engine, tables):
+    """Creates the tables with their primary keys only.
+
+    Unique constraints, secondary indexes and foreign keys are left for
+    finalize_tables once the data is loaded. Dialects without ALTER TABLE
+    ADD CONSTRAINT (SQLite) keep their foreign keys inline, since they could
+    not be added afterwards.
+    """
+    scratch = MetaData()
+    copies = [table.to_metadata(scratch) for table in tables]
+    inline_foreign_keys = None if not engine.dialect.supports_alter else []
+    with engine.begin() as connection:
+        for copy in copies:
+            for constraint in unique_constraints(copy):
+                copy.constraints.discard(constraint)
+            connection.execute(
+                CreateTable(copy, include_foreign_key_constraints=inline_foreign_keys)
+            )
+
+
+def validate_integrity(connection, tables):
+    """Checks foreign keys and unique constraints against the loaded rows in memory.
+
+    Raises ValueError listing every violated constraint, so nothing is added
+    to a schema whose data would break it.
+    """
+    started = time.perf_counter()
+    connection = connection.execution_options(**scan_options())
+    parent_keys = {}
+    problems = []
+    checked = 0
+
+    for table in tables:
+        for fk in sorted(table.foreign_key_constraints, key=lambda c: c.column_keys):
+            referred = tuple(element.column for element in fk.elements)
+            if referred not in parent_keys:
+                parent_keys[referred] = set(connection.execute(select(*referred)).all())
+            keys = parent_keys[referred]
+            orphans = sum(
+                1
+                for row in connection.execute(select(*fk.columns))
+                if None not in row and tuple(row) not in keys
+            )
+            checked += 1
+            if orphans:
+                problems.append(
+                    f"{table.name}({', '.join(fk.column_keys)}) -> "
+                    f"{fk.referred_table.name}: {orphans} orphaned rows"
+                )
+
+        for constraint in unique_constraints(table):
+            counts = Counter(
+                tuple(row)
+                for row in connection.execute(select(*constraint.columns))
+                if None not in row
+            )
+            duplicates = sum(count - 1 for count in counts.values() if count > 1)
+            checked += 1
+            if duplicates:
+                names = ", ".join(column.name for column in constraint.columns)
+                problems.append(f"{table.name}({names}) unique: {duplicates} duplicate rows")
+
+    if problems:
+        raise ValueError("Integrity check failed:\n  " + "\n  ".join(problems))
+    print(f"Checked {checked} constraints in {time.perf_counter() - started:.2f}s.")
+
+
+def _timed(connection, label, statement):
+    started = time.perf_counter()
+    if isinstance(statement, str):
+        connection.exec_driver_sql(statement)
+    else:
+        connection.execute(statement)
+    print(f"Built {label} in {time.perf_counter() - started:.2f}s")
+
+
+def finalize_tables(engine, tables):
+    """Validates the loaded data, then adds the deferred indexes and constraints."""
+    with engine.begin() as connection:
+        validate_integrity(connection, tables)
+
+        started = time.perf_counter()
+        for table in tables:
+            for constraint in unique_constraints(table):
+                names = [column.name for column in constraint.columns]
+                label = f"{table.name} unique ({', '.join(names)})"
+                if engine.dialect.supports_alter:
+                    _timed(connection, label, AddConstraint(constraint))
+                else:
+                    # Without ALTER TABLE ADD CONSTRAINT a unique index does the same job.
+                    quote = engine.dialect.identifier_preparer.quote
+                    name = constraint.name or f"uq_{table.name}_{'_'.join(names)}"
+                    _timed(
+                        connection,
+                        label,
+                        f"CREATE UNIQUE INDEX {quote(name)} ON {quote(table.name)} "
+                        f"({', '.join(quote(n) for n in names)})",
+                    )
+            for index in sorted(table.indexes, key=lambda i: i.name or ""):
+                _timed(connection, f"{table.name} index {index.name}", CreateIndex(index))
+        if engine.dialect.supports_alter:
+            for table in tables:
+                for fk in sorted(table.foreign_key_constraints, key=lambda c: c.column_keys):
+                    label = f"{table.name} foreign key ({', '.join(fk.column_keys)})"
+                    _timed(connection, label, AddConstraint(fk))
+        print(f"Added deferred indexes and constraints in {time.perf_counter() - started:.2f}s.")
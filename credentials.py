@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import random
+
+import numpy as np
+
+from config import (
+    FAKER_POOL_DIR,
+    PASSWORD_HASHES,
+    PASSWORD_POOL,
+    PASSWORD_POOL_EVERY,
+    PASSWORD_POOL_SIZE,
+)
+from faker_pool import cached_json
+from seeding import numpy_rng
+
+try:
+    import bcrypt
+except ImportError:  # Real hashes for test passwords are optional.
+    bcrypt = None
+
+
+BCRYPT_ALPHABET = b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+CRYPT_ALPHABET = b"./0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BCRYPT_COST = 12
+
+# Modular crypt layouts: a fixed prefix, then (random bytes, alphabet, separator) fields.
+HASH_SHAPES = {
+    "bcrypt": (
+        f"$2b${BCRYPT_COST}$".encode(),
+        [(16, BCRYPT_ALPHABET, b""), (23, BCRYPT_ALPHABET, b"")],
+    ),
+    "argon2": (
+        b"$argon2id$v=19$m=65536,t=3,p=4$",
+        [(16, BASE64_ALPHABET, b"$"), (32, BASE64_ALPHABET, b"")],
+    ),
+    "sha256": (b"$5$", [(12, CRYPT_ALPHABET, b"$"), (32, CRYPT_ALPHABET, b"")]),
+}
+
+
+def encode64(raw, alphabet):
+    """Base64-encodes every row of a (rows, n) uint8 array without padding, in `alphabet`."""
+    rows, size = raw.shape
+    padded = np.zeros((rows, -(-size // 3) * 3), dtype=np.uint32)
+    padded[:, :size] = raw
+    groups = padded.reshape(rows, -1, 3)
+    bits = (groups[..., 0] << 16) | (groups[..., 1] << 8) | groups[..., 2]
+    sextets = np.stack([(bits >> shift) & 63 for shift in (18, 12, 6, 0)], axis=-1)
+    chars = -(-size * 4 // 3)
+    return np.frombuffer(alphabet, dtype=np.uint8)[sextets.reshape(rows, -1)[:, :chars]]
+
+
+def hash_block(shape, count, rng):
+    """Returns `count` hashes of one shape as a (count, length) uint8 array.
+
+    All salts and digests come from a single rng.bytes() buffer, encoded
+    with vectorized base64 and laid out behind the shape's prefix.
+    """
+    prefix, fields = HASH_SHAPES[shape]
+    raw = np.frombuffer(rng.bytes(count * sum(f[0] for f in fields)), dtype=np.uint8)
+    raw = raw.reshape(count, -1)
+
+    def constant(value):
+        return np.broadcast_to(np.frombuffer(value, dtype=np.uint8), (count, len(value)))
+
+    parts = [constant(prefix)]
+    offset = 0
+    for size, alphabet, separator in fields:
+        parts.append(encode64(raw[:, offset : offset + size], alphabet))
+        offset += size
+        if separator:
+            parts.append(constant(separator))
+    return np.ascontiguousarray(np.concatenate(parts, axis=1))
+
+
+class HashShapes:
+    """Realistically shaped password hashes, generated in blocks of user ids.
+
+    Block b holds the hashes of users b * block_size + 1 onwards and is
+    seeded by its number, so a user's hash does not depend on chunk_size
+    or workers. Hashes are memoryview slices of the block, not copies.
+    """
+
+    def __init__(self, shape, block_size=4096):
+        if shape not in HASH_SHAPES:
+            raise ValueError(
+                f"Unknown password_hashes '{shape}'; expected random, {', '.join(HASH_SHAPES)}."
+            )
+        self.shape = shape
+        self.block_size = block_size
+        self._number = None
+        self._view = None
+        self._length = 0
+
+    def get(self, user_id):
+        if user_id is None:
+            # Users without an id yet get a one-off hash from the row's random stream.
+            rng = np.random.default_rng(random.getrandbits(64))
+            return hash_block(self.shape, 1, rng).tobytes()
+        number, index = divmod(user_id - 1, self.block_size)
+        if number != self._number:
+            block = hash_block(
+                self.shape, self.block_size, numpy_rng("password_hashes", self.shape, number)
+            )
+            self._number, self._length = number, block.shape[1]
+            self._view = memoryview(block.reshape(-1))
+        return self._view[index * self._length : (index + 1) * self._length]
+
+
+class TestPasswordPool:
+    """Real bcrypt hashes of known test passwords, for login benchmarks.
+
+    Every `every`-th user id gets passwords[(id // every) % len(passwords)],
+    hashed with one of `size` salts per password. The hashes are computed
+    once and cached next to the Faker pools, so seeding never runs bcrypt
+    per row.
+    """
+
+    def __init__(self, passwords, every, size, directory=FAKER_POOL_DIR):
+        self.passwords = list(passwords)
+        self.every = every
+        self.size = size
+        self.directory = directory
+        self._hashes = {}
+
+    def password(self, user_id):
+        """The plain-text test password of a user, or None if it has a generated hash."""
+        if not self.passwords or user_id is None or user_id % self.every:
+            return None
+        return self.passwords[(user_id // self.every) % len(self.passwords)]
+
+    def warm(self):
+        """Loads or computes every password's hashes, e.g. before workers start."""
+        for password in self.passwords:
+            self._pool(password)
+
+    def get(self, user_id):
+        password = self.password(user_id)
+        if password is None:
+            return None
+        hashes = self._pool(password)
+        return hashes[(user_id // self.every // len(self.passwords)) % len(hashes)]
+
+    def _pool(self, password):
+        hashes = self._hashes.get(password)
+        if hashes is None:
+            key = json.dumps([password, BCRYPT_COST, self.size])
+            digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+            path = os.path.join(self.directory, "bcrypt", f"{digest}.json")
+            values = cached_json(path, lambda: self._generate(password))
+            hashes = self._hashes[password] = [value.encode() for value in values]
+        return hashes
+
+    def _generate(self, password):
+        if bcrypt is None:
+            raise ImportError("password_pool requires bcrypt: pip install bcrypt")
+        return [
+            bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_COST)).decode()
+            for _ in range(self.size)
+        ]
+
+
+hash_shapes = None if PASSWORD_HASHES == "random" else HashShapes(PASSWORD_HASHES)
+test_passwords = TestPasswordPool(PASSWORD_POOL, PASSWORD_POOL_EVERY, PASSWORD_POOL_SIZE)
+
+
+def password_hash(user_id):
+    """The password_hash value for a user under the password_hashes and password_pool settings."""
+    real = test_passwords.get(user_id)
+    if real is not None:
+        return real
+    if hash_shapes is not None:
+        return hash_shapes.get(user_id)
+    return random.randbytes(70)
@@ -1,10 +1,62 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import DB_CONNECTION_STRING
+from engine_profile import create_profiled_engine
+from instrumentation import stats
+
+
+def instrument_engine(engine):
+    """Records every statement the engine executes in instrumentation.stats."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        stats.record_query(statement, time.perf_counter() - started)
+
+    return engine
+
+
+def immediate_transactions(engine):
+    """Makes every SQLite transaction take the write lock when it begins.
 
+    pysqlite opens deferred transactions, and a reader upgrading to a writer
+    fails at once with "database is locked" while another process writes,
+    instead of waiting out the busy timeout. BEGIN IMMEDIATE waits for the
+    write lock up front, so concurrent tasks and workers queue on SQLite.
+    """
+    if engine.dialect.name != "sqlite":
+        return engine
 
-engine = create_engine(DB_CONNECTION_STRING)
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def _create_engine():
+    engine = immediate_transactions(create_profiled_engine(DB_CONNECTION_STRING))
+    return instrument_engine(engine) if stats.enabled else engine
+
+
+# File outputs need no database, so the connection string may be unset.
+engine = _create_engine() if DB_CONNECTION_STRING else None
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+def new_session_factory():
+    """Creates a session factory on a fresh engine, e.g. for a worker process."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=_create_engine())
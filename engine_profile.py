@@ -0,0 +1,152 @@
+import argparse
+import importlib.util
+import time
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    select,
+)
+from sqlalchemy.engine import make_url
+
+from config import DB_CONNECTION_STRING, ENGINE
+
+
+# MySQL drivers SQLAlchemy can use, by URL driver name and importable module.
+MYSQL_DRIVERS = {
+    "mysqlconnector": "mysql.connector",
+    "pymysql": "pymysql",
+    "mysqldb": "MySQLdb",
+}
+
+
+def engine_url(url, driver=None):
+    """Returns the URL with its driver swapped for `driver` on MySQL and MariaDB."""
+    url = make_url(url)
+    if driver and url.get_backend_name() in ("mysql", "mariadb"):
+        url = url.set(drivername=f"{url.get_backend_name()}+{driver}")
+    return url
+
+
+def engine_options(url, profile=ENGINE):
+    """create_engine keyword arguments for the [engine] settings in config.toml."""
+    options = {}
+    if profile.get("insertmanyvalues_page_size"):
+        options["insertmanyvalues_page_size"] = profile["insertmanyvalues_page_size"]
+    # SQLite's pools take no sizing; in-memory databases share one connection.
+    # Concurrent workers queue on its write lock, so wait longer than the
+    # default 5s before giving up.
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"timeout": profile.get("sqlite_busy_timeout", 120)}
+    else:
+        for key in ("pool_size", "max_overflow", "pool_recycle"):
+            if profile.get(key) is not None:
+                options[key] = profile[key]
+    return options
+
+
+def create_profiled_engine(url=DB_CONNECTION_STRING, driver=None, profile=ENGINE):
+    """Creates an engine with the configured driver, pool and executemany settings."""
+    url = engine_url(url, driver or profile.get("driver"))
+    return create_engine(url, **engine_options(url, profile))
+
+
+def scan_options(profile=ENGINE):
+    """Execution options for full-table scans: server-side cursors when enabled."""
+    if profile.get("server_side_cursors"):
+        return {"yield_per": profile.get("scan_batch_size", 10000)}
+    return {}
+
+
+def _benchmark_table():
+    return Table(
+        "engine_profile_benchmark",
+        MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("name", String(60)),
+        Column("value", Integer),
+        Column("created", DateTime),
+    )
+
+
+def measure(engine, rows):
+    """Times one executemany insert of `rows` rows and one full scan of them."""
+    table = _benchmark_table()
+    now = datetime(2026, 1, 1)
+    data = [
+        {"id": i, "name": f"row {i}", "value": i * 7 % 1000, "created": now}
+        for i in range(1, rows + 1)
+    ]
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    try:
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            connection.execute(insert(table), data)
+        insert_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            result = connection.execution_options(**scan_options()).execute(select(table))
+            scanned = sum(1 for _ in result)
+        scan_seconds = time.perf_counter() - started
+    finally:
+        table.drop(engine, checkfirst=True)
+    return {
+        "insert_rows_per_sec": rows / insert_seconds if insert_seconds else float("inf"),
+        "scan_rows_per_sec": scanned / scan_seconds if scan_seconds else float("inf"),
+    }
+
+
+def compare_drivers(url=DB_CONNECTION_STRING, rows=20000):
+    """Runs measure() with every installed MySQL driver and prints them fastest first.
+
+    Other databases have a single driver, so only the configured one is measured.
+    """
+    if make_url(url).get_backend_name() in ("mysql", "mariadb"):
+        drivers = [
+            name
+            for name, module in MYSQL_DRIVERS.items()
+            if importlib.util.find_spec(module.split(".")[0]) is not None
+        ]
+        missing = sorted(set(MYSQL_DRIVERS) - set(drivers))
+        if missing:
+            print(f"Skipping drivers that are not installed: {', '.join(missing)}")
+    else:
+        drivers = [None]
+
+    results = {}
+    for driver in drivers:
+        engine = create_profiled_engine(url, driver)
+        try:
+            results[engine.dialect.driver] = measure(engine, rows)
+        finally:
+            engine.dispose()
+
+    print(f"\n{'driver':<16} {'insert rows/s':>14} {'scan rows/s':>14}")
+    ranked = sorted(results, key=lambda d: results[d]["insert_rows_per_sec"], reverse=True)
+    for driver in ranked:
+        result = results[driver]
+        print(
+            f"{driver:<16} {result['insert_rows_per_sec']:>14,.0f} "
+            f"{result['scan_rows_per_sec']:>14,.0f}"
+        )
+    if len(ranked) > 1:
+        print(
+            f"\nFastest for bulk inserts: {ranked[0]} "
+            f'(set driver = "{ranked[0]}" under [engine]).'
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare database drivers for bulk seeding.")
+    parser.add_argument("--rows", type=int, default=20000)
+    compare_drivers(rows=parser.parse_args().rows)
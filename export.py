@@ -0,0 +1,274 @@
+import random
+import weakref
+from collections import defaultdict
+
+from factory.alchemy import SQLAlchemyModelFactory
+from sqlalchemy import inspect
+from sqlalchemy.orm import MANYTOONE, RelationshipProperty
+from tqdm import tqdm
+
+import bulk
+import factories
+import models
+import pipeline
+import seed
+from config import (
+    ACTIVITY_RATE,
+    CHUNK_SIZE,
+    CONNECTION_DEGREE,
+    CONNECTION_TYPES,
+    DATA_GENERATION_SIZE,
+    NOTIFICATIONS_PER_USER,
+    TIMESERIES_DAYS,
+)
+from database import Base
+from key_pool import key_pools
+from lookup_cache import lookups
+from matching import PartnerMatcher
+from scale import connection_degrees, degree_spec, key_weights, table_count
+from seeding import numpy_rng, reseed
+from staging import ColumnStore
+from timeseries import block_count, iter_notification_blocks, iter_progress_blocks
+
+
+def get_or_create_fields():
+    """Maps each model to the sqlalchemy_get_or_create fields of its factory."""
+    fields = {}
+    for factory_class in SQLAlchemyModelFactory.__subclasses__():
+        if factory_class._meta.sqlalchemy_get_or_create:
+            fields[factory_class._meta.model] = factory_class._meta.sqlalchemy_get_or_create
+    return fields
+
+
+class RowSink:
+    """Turns built (unsaved) ORM objects into plain rows without a database.
+
+    It stands in for a session flush: related objects are written first,
+    autoincrement keys are assigned from per-table counters, and rows that
+    match an existing row on their factory's get_or_create fields reuse
+    that row's key instead of being written again. Rows are buffered per
+    table and handed to the writer in foreign-key order.
+    """
+
+    def __init__(self, writer, batch_size):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.counts = defaultdict(int)
+        self._last_ids = defaultdict(int)
+        self._keys = weakref.WeakKeyDictionary()
+        self._unique_fields = get_or_create_fields()
+        self._unique = defaultdict(dict)
+        self._buffers = defaultdict(list)
+
+    def _unique_key(self, obj, mapper, fields):
+        values = []
+        for field in fields:
+            prop = mapper.attrs[field]
+            if isinstance(prop, RelationshipProperty):
+                values.extend(
+                    getattr(obj, mapper.get_property_by_column(local).key)
+                    for local, _ in prop.local_remote_pairs
+                )
+            else:
+                values.append(getattr(obj, field))
+        return tuple(values)
+
+    def persist(self, obj):
+        """Writes an object (and any unsaved parents) and returns its primary key."""
+        if obj in self._keys:
+            return self._keys[obj]
+        model = type(obj)
+        mapper = inspect(model)
+
+        for relationship in mapper.relationships:
+            related = obj.__dict__.get(relationship.key)
+            if relationship.direction is not MANYTOONE or related is None:
+                continue
+            related_key = self.persist(related)
+            # Parents all have single-column keys, so one pair links the rows.
+            (local, _), = relationship.local_remote_pairs
+            setattr(obj, mapper.get_property_by_column(local).key, related_key)
+
+        fields = self._unique_fields.get(model)
+        if fields:
+            unique_key = self._unique_key(obj, mapper, fields)
+            existing = self._unique[model].get(unique_key)
+            if existing is not None:
+                self._keys[obj] = existing
+                return existing
+
+        key = None
+        if len(mapper.primary_key) == 1:
+            attr = mapper.get_property_by_column(mapper.primary_key[0]).key
+            key = getattr(obj, attr)
+            table = mapper.local_table
+            if key is None:
+                key = self._last_ids[table] + 1
+                setattr(obj, attr, key)
+            if isinstance(key, int):
+                self._last_ids[table] = max(self._last_ids[table], key)
+            key_pools.add_keys(model, [key])
+        if fields:
+            self._unique[model][unique_key] = key
+        if model in seed.LOOKUP_MODELS:
+            lookups.add(model, obj)
+
+        self.write_row(
+            mapper.local_table,
+            {
+                column.name: getattr(obj, mapper.get_property_by_column(column).key)
+                for column in mapper.local_table.columns
+            },
+        )
+        self._keys[obj] = key
+        return key
+
+    def write_row(self, table, row):
+        buffer = self._buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, table, rows):
+        self._buffers[table].extend(rows)
+        self.flush()
+
+    def write_blocks(self, table, blocks, total, description):
+        """Writes {column: array} blocks, e.g. from timeseries, through a ColumnStore."""
+        store = ColumnStore(table)
+        for columns in tqdm(blocks, total=total, desc=description):
+            store.extend(columns)
+            self.write_rows(table, store.to_rows())
+            store.clear()
+
+    def flush(self):
+        """Hands every buffered batch to the writer, parents before children."""
+        for table in Base.metadata.sorted_tables:
+            rows = self._buffers.pop(table, None)
+            if rows:
+                self.writer.write(table, rows)
+                self.counts[table.name] += len(rows)
+
+
+def export_dataset(writer, size=DATA_GENERATION_SIZE, chunk_size=CHUNK_SIZE):
+    """Generates the full dataset through `writer` without touching a database.
+
+    Follows the same phases, counts and seed streams as seed.run_seeder.
+    """
+    factories.bind_session(None)
+    factories.reset_iterators()
+    sink = RowSink(writer, chunk_size)
+    writer.open(Base.metadata.sorted_tables)
+    try:
+        print("Generating regions and independent lookup tables...")
+        for region in seed.build_regions():
+            sink.persist(region)
+        for description, factory_class, num in tqdm(
+            seed.independent_tasks(size), desc="Independent Tables"
+        ):
+            reseed("independent", description)
+            for _ in range(num):
+                sink.persist(factory_class.build())
+
+        business_rows = []
+        for start, count in tqdm(
+            list(pipeline.iter_chunks(size, chunk_size)), desc="User chunks"
+        ):
+            users, entities = pipeline.generate_user_chunk(start, count)
+            for obj in users + entities:
+                sink.persist(obj)
+            business_rows.extend(
+                (obj.id, obj.business_type_id, obj.business_category_id)
+                for obj in entities
+                if isinstance(obj, models.Business)
+            )
+
+        reseed("projects")
+        user_ids = key_pools.pool(models.User).keys
+        num_projects = table_count("projects", int(size * 0.4), size)
+        manager_ids = random.sample(user_ids, min(len(user_ids), num_projects))
+        for manager_id in manager_ids:
+            sink.persist(factories.ProjectFactory.build(managed_by_user_id=manager_id))
+
+        reseed("connections")
+        matcher = PartnerMatcher(business_rows)
+        connection_type_ids = [
+            row.id
+            for row in lookups.all(models.ConnectionType)
+            if row.name in CONNECTION_TYPES
+        ]
+        if connection_type_ids:
+            degrees = connection_degrees(
+                matcher.business_ids, CONNECTION_DEGREE, numpy_rng("connections", "degrees")
+            )
+            created = 0
+            for business_id, degree in tqdm(
+                zip(matcher.business_ids, degrees),
+                total=len(matcher.business_ids),
+                desc="Finding Partners",
+            ):
+                for partner_id in matcher.sample(business_id, degree):
+                    created += 1
+                    sink.persist(
+                        factories.BusinessConnectionFactory.build(
+                            initiating_business_id=business_id,
+                            receiving_business_id=partner_id,
+                            connection_type_id=random.choice(connection_type_ids),
+                        )
+                    )
+            seed.warn_connection_shortfall(created, sum(degrees))
+
+        enrolments = []
+        for description, factory_class, num in tqdm(
+            seed.many_to_many_tasks(size), desc="Relationship Tables"
+        ):
+            model = factory_class._meta.model
+            reseed("links", model.__tablename__)
+            if bulk.is_link_model(model):
+                rows = bulk.build_link_rows(
+                    model, num, numpy_rng("links", model.__tablename__)
+                )
+                sink.write_rows(model.__table__, rows)
+                if model is models.DailyActivityEnrolment:
+                    enrolments = [(row["daily_activity_id"], row["user_id"]) for row in rows]
+            else:
+                rng = numpy_rng("links", model.__tablename__, "degrees")
+                with bulk.skewed_foreign_keys(model, rng):
+                    for _ in range(num):
+                        sink.persist(factory_class.build())
+
+        end = factories.NOW.date()
+        sink.write_blocks(
+            models.UserDailyActivityProgress.__table__,
+            iter_progress_blocks(enrolments, TIMESERIES_DAYS, end, ACTIVITY_RATE),
+            block_count(len(enrolments)),
+            "Daily Activity Progress",
+        )
+
+        user_ids = key_pools.pool(models.User).keys
+        weights = key_weights(
+            degree_spec("notifications", "sender_user_id"),
+            len(user_ids),
+            numpy_rng("notifications", "weights"),
+        )
+        sink.write_blocks(
+            models.Notification.__table__,
+            iter_notification_blocks(
+                user_ids,
+                table_count("notifications", size * NOTIFICATIONS_PER_USER, size),
+                TIMESERIES_DAYS,
+                end,
+                weights,
+                1,
+            ),
+            block_count(len(user_ids)),
+            "Notifications",
+        )
+
+        sink.flush()
+    finally:
+        writer.close()
+
+    for table in Base.metadata.sorted_tables:
+        print(f"{table.name}: {sink.counts[table.name]} rows")
+    return dict(sink.counts)
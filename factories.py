@@ -1,5 +1,5 @@
-import os
 import random
+import credentials
 import factory
 import factories
 import models
@@ -8,11 +8,20 @@ import pytz
 from datetime import timedelta
 from factory.alchemy import SQLAlchemyModelFactory
 from faker import Faker
-from sqlalchemy import func, not_
+
+from faker_pool import faker_field
+from instrumentation import stats
+from key_pool import key_pools
+from lookup_cache import lookups
+from matching import PartnerMatcher
+from seeding import reference_time
 
 
 fake = Faker("en_AU")
 AEST = pytz.timezone("Australia/Brisbane")
+NOW = reference_time(AEST)
+# "This year" is a trailing window, which is not empty on a 1 January reference_date.
+YEAR_AGO = NOW - timedelta(days=365)
 
 business_data = {
     "SaaS": {
@@ -189,8 +198,8 @@ class UserFactory(SQLAlchemyModelFactory):
         model = models.User
         sqlalchemy_session_persistence = "flush"
 
-    first_name = factory.Faker("first_name")
-    last_name = factory.Faker("last_name")
+    first_name = faker_field("first_name")
+    last_name = faker_field("last_name")
     contact_email = factory.LazyAttribute(
         lambda o: f"{o.first_name.lower()}.{o.last_name.lower()}@example.com"
     )
@@ -205,7 +214,7 @@ class BusinessCategoryFactory(SQLAlchemyModelFactory):
         sqlalchemy_session_persistence = "flush"
         sqlalchemy_get_or_create = ("name",)
 
-    name = factory.Faker("bs")
+    name = faker_field("bs")
 
 
 class BusinessPhaseFactory(SQLAlchemyModelFactory):
@@ -256,34 +265,46 @@ class IdeaFactory(SQLAlchemyModelFactory):
 # ===================================================================
 # HELPER FUNCTIONS
 # ===================================================================
-def get_random(model, exclude=None):
-    """Helper function to get a random instance of a model from the DB with optional exclusion."""
-    session = UserFactory._meta.sqlalchemy_session
-    if session:
-        query = session.query(model)
-        if query.count() > 0:
-            if exclude:
-                query = query.filter(not_(exclude))
-            return query.order_by(func.random()).first()
-    return None
-
-
-def get_complementary_business(session, base_business):
-    """Finds a business that is a good complementary partner."""
-    if not base_business or not base_business.business_type:
-        return None
+@stats.timed
+def get_random_id(model, exclude=None):
+    """Returns a random primary key of a model from the in-memory key pool, skipping `exclude`."""
+    return key_pools.sample(model, exclude=exclude)
+
+
+def reset_iterators():
+    """Rewinds every factory.Iterator declaration so runs start from the same values."""
+    for factory_class in SQLAlchemyModelFactory.__subclasses__():
+        for declaration in factory_class._meta.declarations.values():
+            if isinstance(declaration, factory.Iterator):
+                declaration.reset()
+
+
+def bind_session(session):
+    """Points every factory and the key pools at the given session."""
+    for factory_class in SQLAlchemyModelFactory.__subclasses__():
+        factory_class._meta.sqlalchemy_session = session
+    key_pools.bind(session)
+    lookups.bind(session)
 
-    complementary_partner = (
-        session.query(models.Business)
-        .filter(
-            models.Business.id != base_business.id,
-            models.Business.business_type_id == base_business.business_type_id,
-            models.Business.business_category_id != base_business.business_category_id,
-        )
-        .order_by(func.random())
-        .first()
-    )
-    return complementary_partner
+
+_partner_matcher = None  # (session, pooled business count, PartnerMatcher)
+
+
+def get_complementary_business_id(business_id):
+    """Draws a complementary partner for a business, or None if it has none.
+
+    Partners come from an in-memory PartnerMatcher, rebuilt only when the
+    session or the number of pooled businesses changes.
+    """
+    global _partner_matcher
+    session = key_pools.session
+    if session is None:
+        return None
+    count = len(key_pools.pool(models.Business))
+    if _partner_matcher is None or _partner_matcher[:2] != (session, count):
+        _partner_matcher = (session, count, PartnerMatcher.load(session))
+    partners = _partner_matcher[2].sample(business_id)
+    return partners[0] if partners else None
 
 
 # ===================================================================
@@ -293,21 +314,22 @@ class BusinessFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.Business
         sqlalchemy_session_persistence = "flush"
+        exclude = ("business_type",)
 
     operator = factory.SubFactory(UserFactory)
-    business_type = factory.LazyFunction(lambda: get_random(models.BusinessType))
-    business_category = factory.LazyFunction(
-        lambda: get_random(models.BusinessCategory)
+    business_type = factory.LazyFunction(lambda: lookups.random(models.BusinessType))
+    business_type_id = factory.LazyAttribute(lambda o: o.business_type.id)
+    business_category_id = factory.LazyFunction(
+        lambda: lookups.random(models.BusinessCategory).id
     )
 
     @factory.lazy_attribute
-    def phase(self):
-        session = UserFactory._meta.sqlalchemy_session
+    def business_phase(self):
         if self.business_type.name == "SaaS":
             phase_name = random.choice(["Startup", "Growth"])
         else:
             phase_name = random.choice(["Growth", "Mature"])
-        return session.query(models.BusinessPhase).filter_by(name=phase_name).one()
+        return lookups.get(models.BusinessPhase, phase_name).id
 
     @factory.lazy_attribute
     def name(self):
@@ -328,8 +350,8 @@ class BusinessFactory(SQLAlchemyModelFactory):
     website = factory.LazyAttribute(
         lambda o: f"https://www.{o.name.replace(' ', '').replace('.', '').lower()}.com.au"
     )
-    description = factory.Faker("paragraph", nb_sentences=3)
-    address = factory.Faker("street_address")
+    description = faker_field("paragraph", nb_sentences=3)
+    address = faker_field("street_address")
     city = "Brisbane"
 
 
@@ -363,10 +385,15 @@ class ProjectFactory(SQLAlchemyModelFactory):
         sqlalchemy_session_persistence = "flush"
 
     name = factory.Iterator(project_names)
-    manager = factory.SubFactory(UserFactory)
+    managed_by_user_id = factory.LazyFunction(
+        lambda: get_random_id(models.User) or UserFactory().id
+    )
     project_status = factory.Iterator(["open", "closed", "complete"])
     projection_open = factory.Faker(
-        "date_time_between", start_date="-1y", end_date="-1m", tzinfo=AEST
+        "date_time_between",
+        start_date=NOW - timedelta(days=365),
+        end_date=NOW - timedelta(days=30),
+        tzinfo=AEST,
     )
     project_closed = None
     project_completion = None
@@ -388,7 +415,7 @@ class SkillCategoryFactory(SQLAlchemyModelFactory):
         model = models.SkillCategory
         sqlalchemy_session_persistence = "flush"
 
-    name = factory.Faker("job")
+    name = faker_field("job")
     business_type = factory.SubFactory(BusinessTypeFactory)
 
 
@@ -410,7 +437,7 @@ class UserLoginFactory(SQLAlchemyModelFactory):
 
     user = factory.SubFactory(UserFactory)
     login_email = factory.LazyAttribute(lambda o: o.user.contact_email)
-    password_hash = factory.LazyAttribute(lambda _: os.urandom(70))
+    password_hash = factory.LazyAttribute(lambda o: credentials.password_hash(o.user.id))
     password_reset_token = None
     password_reset_requested_timestamp = None
 
@@ -430,10 +457,16 @@ class UserSubscriptionFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.UserSubscription
         sqlalchemy_session_persistence = "flush"
+        exclude = ("subscription",)
 
     user = factory.SubFactory(UserFactory)
-    subscription = factory.SubFactory(SubscriptionFactory)
-    date_from = factory.Faker("date_time_this_year", tzinfo=AEST)
+    subscription = factory.LazyFunction(
+        lambda: lookups.random(models.Subscription) or SubscriptionFactory()
+    )
+    subscription_id = factory.LazyAttribute(lambda o: o.subscription.id)
+    date_from = factory.Faker(
+        "date_time_between", start_date=YEAR_AGO, end_date=NOW, tzinfo=AEST
+    )
     date_to = factory.LazyAttribute(
         lambda o: o.date_from + timedelta(days=o.subscription.valid_days)
     )
@@ -459,8 +492,8 @@ class DailyActivityFactory(SQLAlchemyModelFactory):
         model = models.DailyActivity
         sqlalchemy_session_persistence = "flush"
 
-    name = factory.Faker("word")
-    description = factory.Faker("sentence")
+    name = faker_field("word")
+    description = faker_field("sentence")
 
 
 class IndustryCategoryFactory(SQLAlchemyModelFactory):
@@ -469,7 +502,7 @@ class IndustryCategoryFactory(SQLAlchemyModelFactory):
         sqlalchemy_session_persistence = "flush"
         sqlalchemy_get_or_create = ("name",)
 
-    name = factory.Faker("job")
+    name = faker_field("job")
 
 
 class IndustryFactory(SQLAlchemyModelFactory):
@@ -477,7 +510,7 @@ class IndustryFactory(SQLAlchemyModelFactory):
         model = models.Industry
         sqlalchemy_session_persistence = "flush"
 
-    name = factory.Faker("job")
+    name = faker_field("job")
     picture = None
     category = factory.SubFactory(IndustryCategoryFactory)
 
@@ -505,7 +538,7 @@ class StrengthFactory(SQLAlchemyModelFactory):
         model = models.Strength
         sqlalchemy_session_persistence = "flush"
 
-    name = factory.Faker("job")
+    name = faker_field("job")
     category = factory.SubFactory(StrengthCategoryFactory)
 
 
@@ -514,7 +547,7 @@ class BusinessStrengthFactory(SQLAlchemyModelFactory):
         model = models.BusinessStrength
         sqlalchemy_session_persistence = "flush"
 
-    name = factory.Faker("job")
+    name = faker_field("job")
     role = factory.SubFactory(BusinessRoleFactory)
     phase = factory.SubFactory(BusinessPhaseFactory)
 
@@ -524,14 +557,16 @@ class CaseStudyFactory(SQLAlchemyModelFactory):
         model = models.CaseStudy
         sqlalchemy_session_persistence = "flush"
 
-    title = factory.Faker("sentence")
-    content = factory.Faker("text")
+    title = faker_field("sentence")
+    content = faker_field("text")
     thumbnail = factory.LazyAttribute(
         lambda _: f"https://placehold.co/600x400/cccccc/222222?text=Case+Study"
     )
     video_url = None
     published = True
-    owner = factory.SubFactory(UserFactory)
+    owner_user_id = factory.LazyFunction(
+        lambda: get_random_id(models.User) or UserFactory().id
+    )
 
 
 # ===================================================================
@@ -544,20 +579,26 @@ class BusinessConnectionFactory(SQLAlchemyModelFactory):
         model = models.BusinessConnection
         sqlalchemy_session_persistence = "flush"
 
-    initiating_business = factory.LazyFunction(lambda: get_random(models.Business))
+    initiating_business_id = factory.LazyFunction(
+        lambda: get_random_id(models.Business)
+    )
 
     @factory.lazy_attribute
-    def receiving_business(self):
-        session = UserFactory._meta.sqlalchemy_session
-        partner = get_complementary_business(session, self.initiating_business)
-        return partner or get_random(
-            models.Business, exclude=(models.Business.id == self.initiating_business.id)
-        )
-
-    connection_type = factory.SubFactory(ConnectionTypeFactory)
+    def receiving_business_id(self):
+        partner = get_complementary_business_id(self.initiating_business_id)
+        if partner is not None:
+            return partner
+        return get_random_id(models.Business, exclude=self.initiating_business_id)
+
+    connection_type_id = factory.LazyFunction(
+        lambda: get_random_id(models.ConnectionType) or ConnectionTypeFactory().id
+    )
     active = True
     date_initiated = factory.Faker(
-        "date_time_between", start_date="-2y", end_date="now", tzinfo=AEST
+        "date_time_between",
+        start_date=NOW - timedelta(days=730),
+        end_date=NOW,
+        tzinfo=AEST,
     )
 
 
@@ -565,20 +606,22 @@ class DailyActivityEnrolmentFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.DailyActivityEnrolment
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("activity", "user")
+        sqlalchemy_get_or_create = ("daily_activity_id", "user_id")
 
-    activity = factory.LazyFunction(lambda: get_random(models.DailyActivity))
-    user = factory.LazyFunction(lambda: get_random(models.User))
+    daily_activity_id = factory.LazyFunction(
+        lambda: get_random_id(models.DailyActivity)
+    )
+    user_id = factory.LazyFunction(lambda: get_random_id(models.User))
 
 
 class IdeaVoteFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.IdeaVote
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("voter", "idea")
+        sqlalchemy_get_or_create = ("voter_user_id", "idea_id")
 
-    idea = factory.LazyFunction(lambda: get_random(models.Idea))
-    voter = factory.LazyFunction(lambda: get_random(models.User))
+    idea_id = factory.LazyFunction(lambda: get_random_id(models.Idea))
+    voter_user_id = factory.LazyFunction(lambda: get_random_id(models.User))
     type = factory.Faker("boolean")
 
 
@@ -587,11 +630,14 @@ class NotificationFactory(SQLAlchemyModelFactory):
         model = models.Notification
         sqlalchemy_session_persistence = "flush"
 
-    sender = factory.LazyFunction(lambda: get_random(models.User))
-    receiver = factory.LazyFunction(lambda: get_random(models.User))
-    message = factory.Faker("sentence")
+    sender_user_id = factory.LazyFunction(lambda: get_random_id(models.User))
+    receiver_user_id = factory.LazyFunction(lambda: get_random_id(models.User))
+    message = faker_field("sentence")
     time_sent = factory.Faker(
-        "date_time_between", start_date="-1y", end_date="now", tzinfo=AEST
+        "date_time_between",
+        start_date=NOW - timedelta(days=365),
+        end_date=NOW,
+        tzinfo=AEST,
     )
     opened = factory.Faker("boolean")
 
@@ -600,11 +646,11 @@ class UserSkillFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.UserSkill
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("user", "skill")
+        sqlalchemy_get_or_create = ("user_id", "skill_id")
 
-    user = factory.LazyFunction(lambda: get_random(models.User))
-    skill = factory.LazyFunction(
-        lambda: get_random(models.Skill) or factories.SkillFactory()
+    user_id = factory.LazyFunction(lambda: get_random_id(models.User))
+    skill_id = factory.LazyFunction(
+        lambda: get_random_id(models.Skill) or factories.SkillFactory().id
     )
 
 
@@ -612,10 +658,12 @@ class UserBusinessStrengthFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.UserBusinessStrength
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("user", "strength")
+        sqlalchemy_get_or_create = ("user_id", "business_strength_id")
 
-    user = factory.LazyFunction(lambda: get_random(models.User))
-    strength = factory.SubFactory(BusinessStrengthFactory)
+    user_id = factory.LazyFunction(lambda: get_random_id(models.User))
+    business_strength_id = factory.LazyFunction(
+        lambda: get_random_id(models.BusinessStrength) or BusinessStrengthFactory().id
+    )
 
 
 class UserDailyActivityProgressFactory(SQLAlchemyModelFactory):
@@ -623,9 +671,13 @@ class UserDailyActivityProgressFactory(SQLAlchemyModelFactory):
         model = models.UserDailyActivityProgress
         sqlalchemy_session_persistence = "flush"
 
-    user = factory.LazyFunction(lambda: get_random(models.User))
-    activity = factory.LazyFunction(lambda: get_random(models.DailyActivity))
-    date = factory.Faker("date_this_year")
+    user_id = factory.LazyFunction(lambda: get_random_id(models.User))
+    daily_activity_id = factory.LazyFunction(
+        lambda: get_random_id(models.DailyActivity)
+    )
+    date = factory.Faker(
+        "date_between", start_date=YEAR_AGO.date(), end_date=NOW.date()
+    )
     progress = factory.LazyAttribute(lambda _: random.randint(0, 100))
 
 
@@ -633,47 +685,57 @@ class UserStrengthFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.UserStrength
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("user", "strength")
+        sqlalchemy_get_or_create = ("user_id", "strength_id")
 
-    user = factory.LazyFunction(lambda: get_random(models.User))
-    strength = factory.SubFactory(StrengthFactory)
+    user_id = factory.LazyFunction(lambda: get_random_id(models.User))
+    strength_id = factory.LazyFunction(
+        lambda: get_random_id(models.Strength) or StrengthFactory().id
+    )
 
 
 class ConnectionMastermindRoleFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.ConnectionMastermindRole
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("connection", "role")
+        sqlalchemy_get_or_create = ("connection_id", "mastermind_role_id")
 
-    connection = factory.LazyFunction(lambda: get_random(models.BusinessConnection))
-    role = factory.LazyFunction(lambda: get_random(models.MastermindRole))
+    connection_id = factory.LazyFunction(
+        lambda: get_random_id(models.BusinessConnection)
+    )
+    mastermind_role_id = factory.LazyFunction(
+        lambda: get_random_id(models.MastermindRole)
+    )
 
 
 class ProjectBusinessCategoryFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.ProjectBusinessCategory
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("project", "category")
+        sqlalchemy_get_or_create = ("project_id", "business_category_id")
 
-    project = factory.LazyFunction(lambda: get_random(models.Project))
-    category = factory.LazyFunction(lambda: get_random(models.BusinessCategory))
+    project_id = factory.LazyFunction(lambda: get_random_id(models.Project))
+    business_category_id = factory.LazyFunction(
+        lambda: get_random_id(models.BusinessCategory)
+    )
 
 
 class ProjectRegionFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.ProjectRegion
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("project", "region")
+        sqlalchemy_get_or_create = ("project_id", "region_id")
 
-    project = factory.LazyFunction(lambda: get_random(models.Project))
-    region = factory.LazyFunction(lambda: get_random(models.Region))
+    project_id = factory.LazyFunction(lambda: get_random_id(models.Project))
+    region_id = factory.LazyFunction(lambda: get_random_id(models.Region))
 
 
 class ProjectBusinessSkillFactory(SQLAlchemyModelFactory):
     class Meta:
         model = models.ProjectBusinessSkill
         sqlalchemy_session_persistence = "flush"
-        sqlalchemy_get_or_create = ("project", "skill")
+        sqlalchemy_get_or_create = ("project_id", "business_skill_id")
 
-    project = factory.LazyFunction(lambda: get_random(models.Project))
-    skill = factory.LazyFunction(lambda: get_random(models.BusinessSkill))
+    project_id = factory.LazyFunction(lambda: get_random_id(models.Project))
+    business_skill_id = factory.LazyFunction(
+        lambda: get_random_id(models.BusinessSkill)
+    )
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+
+import factory
+import faker
+import numpy as np
+
+from config import FAKER_POOL_DIR, FAKER_POOL_SIZE, FAKER_POOLS, SEED
+from seeding import derive_seed
+
+
+# factory.Faker's default locale, so pooled fields read the same as unpooled ones.
+LOCALE = "en_US"
+
+
+class ValuePool:
+    """A pre-generated pool of values from one Faker provider call."""
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=object)
+
+    def __len__(self):
+        return len(self.values)
+
+    def draw(self):
+        """Returns one value; row-level draws use `random` so reseeding applies."""
+        return self.values[random.randrange(len(self.values))]
+
+    def sample(self, size, rng):
+        """Returns `size` values as an object array using NumPy index sampling."""
+        return self.values[rng.integers(0, len(self.values), size)]
+
+
+def cached_json(path, generate):
+    """Returns the JSON value cached at `path`, saving generate()'s result on a miss.
+
+    The file is written then renamed, so concurrent workers never read a
+    partial file.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    value = generate()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(handle, "w", encoding="utf-8") as f:
+        json.dump(value, f)
+    os.replace(temp_path, path)
+    return value
+
+
+class FakerPools:
+    """Value pools per (provider, arguments), generated once per locale and cached on disk."""
+
+    def __init__(self, locale=LOCALE, size=FAKER_POOL_SIZE, directory=FAKER_POOL_DIR):
+        self.locale = locale
+        self.size = size
+        self.directory = directory
+        self._pools = {}
+
+    def _cache_path(self, provider, kwargs):
+        # Pools are generated from the global seed, so it is part of the key.
+        key = json.dumps(
+            [faker.VERSION, SEED, self.locale, provider, kwargs, self.size], sort_keys=True
+        )
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, self.locale, f"{provider}-{digest}.json")
+
+    def _generate(self, provider, kwargs):
+        generator = faker.Faker(self.locale)
+        generator.seed_instance(derive_seed("faker-pool", self.locale, provider, repr(kwargs)))
+        method = getattr(generator, provider)
+        return [method(**kwargs) for _ in range(self.size)]
+
+    def get(self, provider, **kwargs):
+        key = (provider, tuple(sorted(kwargs.items())))
+        pool = self._pools.get(key)
+        if pool is None:
+            values = cached_json(
+                self._cache_path(provider, kwargs), lambda: self._generate(provider, kwargs)
+            )
+            pool = self._pools[key] = ValuePool(values)
+        return pool
+
+
+faker_pools = FakerPools()
+
+
+class PooledFaker(factory.declarations.BaseDeclaration):
+    """Drop-in for factory.Faker that serves values from a pre-generated pool."""
+
+    def __init__(self, provider, **kwargs):
+        super().__init__()
+        self.provider = provider
+        self.provider_kwargs = kwargs
+
+    def evaluate(self, instance, step, extra):
+        return faker_pools.get(self.provider, **self.provider_kwargs).draw()
+
+
+def faker_field(provider, **kwargs):
+    """Returns a pooled declaration when faker_pools is enabled, else factory.Faker."""
+    if FAKER_POOLS:
+        return PooledFaker(provider, **kwargs)
+    return factory.Faker(provider, **kwargs)
+
+
+def faker_sample(provider, size, rng, **kwargs):
+    """Draws `size` values with `rng`, from the pool if faker_pools is enabled, else from Faker."""
+    if FAKER_POOLS:
+        return faker_pools.get(provider, **kwargs).sample(size, rng)
+    generator = faker.Faker(LOCALE)
+    generator.seed_instance(int(rng.integers(1 << 63)))
+    method = getattr(generator, provider)
+    return np.array([method(**kwargs) for _ in range(size)], dtype=object)
@@ -0,0 +1,141 @@
+import functools
+import heapq
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from factory.alchemy import SQLAlchemyModelFactory
+
+from config import INSTRUMENT
+
+
+class Instrumentation:
+    """Query counts, DB time and call timings, aggregated per scope.
+
+    A scope is the innermost factory `_create` or seeding task running when
+    a statement executes, so an N+1 pattern shows up as a scope with far
+    more queries than rows.
+    """
+
+    def __init__(self, slowest=10):
+        self.enabled = False
+        self.slowest_count = slowest
+        self._scopes = ["(outside tasks)"]
+        self.reset()
+
+    def reset(self):
+        self.queries = Counter()
+        self.db_time = defaultdict(float)
+        self.calls = Counter()
+        self.call_time = defaultdict(float)
+        self.slowest = []
+
+    def enable(self):
+        """Turns recording on and wraps every factory's _create in a timed scope."""
+        if self.enabled:
+            return
+        self.enabled = True
+        create = SQLAlchemyModelFactory._create.__func__
+
+        def _create(cls, model_class, *args, **kwargs):
+            with self.scope(cls.__name__), self.timer(f"{cls.__name__}._create"):
+                return create(cls, model_class, *args, **kwargs)
+
+        SQLAlchemyModelFactory._create = classmethod(_create)
+
+    @contextmanager
+    def scope(self, name):
+        self._scopes.append(name)
+        try:
+            yield
+        finally:
+            self._scopes.pop()
+
+    @contextmanager
+    def timer(self, name):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.calls[name] += 1
+            self.call_time[name] += time.perf_counter() - started
+
+    def timed(self, fn):
+        """Decorator that times every call of `fn` while instrumentation is enabled."""
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            with self.timer(fn.__name__):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    def record_query(self, statement, seconds):
+        scope = self._scopes[-1]
+        self.queries[scope] += 1
+        self.db_time[scope] += seconds
+        entry = (seconds, scope, " ".join(statement.split())[:160])
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def drain(self):
+        """Returns the recorded numbers and resets them, e.g. to ship out of a worker."""
+        if not self.enabled:
+            return None
+        snapshot = (
+            dict(self.queries),
+            dict(self.db_time),
+            dict(self.calls),
+            dict(self.call_time),
+            list(self.slowest),
+        )
+        self.reset()
+        return snapshot
+
+    def merge(self, snapshot):
+        """Adds a snapshot from drain() in another process."""
+        if snapshot is None:
+            return
+        queries, db_time, calls, call_time, slowest = snapshot
+        self.queries.update(queries)
+        self.calls.update(calls)
+        for scope, seconds in db_time.items():
+            self.db_time[scope] += seconds
+        for name, seconds in call_time.items():
+            self.call_time[name] += seconds
+        for entry in slowest:
+            heapq.heappush(self.slowest, tuple(entry))
+        self.slowest = heapq.nlargest(self.slowest_count, self.slowest)
+        heapq.heapify(self.slowest)
+
+    def summary(self, limit=15):
+        if not self.enabled:
+            return
+        print("\nQueries per scope (by DB time):")
+        print(f"  {'scope':<40} {'queries':>9} {'db time':>9}")
+        for scope in sorted(self.db_time, key=self.db_time.get, reverse=True)[:limit]:
+            print(f"  {scope:<40} {self.queries[scope]:>9} {self.db_time[scope]:>8.2f}s")
+        print(
+            f"  {'total':<40} {sum(self.queries.values()):>9} "
+            f"{sum(self.db_time.values()):>8.2f}s"
+        )
+
+        print("\nTimed calls:")
+        for name in sorted(self.call_time, key=self.call_time.get, reverse=True)[:limit]:
+            print(f"  {name:<40} {self.calls[name]:>9} {self.call_time[name]:>8.2f}s")
+
+        print("\nSlowest statements:")
+        for seconds, scope, statement in sorted(self.slowest, reverse=True):
+            print(f"  {seconds * 1000:8.1f} ms  [{scope}] {statement}")
+
+
+stats = Instrumentation()
+if INSTRUMENT:
+    stats.enable()
@@ -0,0 +1,243 @@
+import random
+
+from sqlalchemy import event, inspect
+
+from engine_profile import scan_options
+
+
+class KeyPool:
+    """Primary keys of one model, held in memory for O(1) random sampling."""
+
+    def __init__(self, model):
+        self.model = model
+        mapper = inspect(model)
+        self.column = mapper.primary_key[0]
+        self.attr = mapper.get_property_by_column(self.column).key
+        self.keys = []
+        self.loaded = False
+        self._index = {}
+        self._weight_fn = None
+        self._alias = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def load(self, session):
+        """Loads every primary key of the model from the database."""
+        self.clear()
+        query = session.query(self.column).order_by(self.column)
+        for (key,) in query.execution_options(**scan_options()):
+            self.add(key)
+        self.loaded = True
+
+    def clear(self):
+        self.keys = []
+        self._index = {}
+        self._alias = None
+        self.loaded = False
+
+    def position(self, key):
+        """Returns the key's index in `keys`, or None if it is not pooled."""
+        return self._index.get(key)
+
+    def add(self, key):
+        if key is None or key in self._index:
+            return False
+        self._index[key] = len(self.keys)
+        self.keys.append(key)
+        self._alias = None
+        return True
+
+    def discard(self, key):
+        """Removes a key by swapping the last key into its slot."""
+        position = self._index.pop(key, None)
+        if position is None:
+            return False
+        last = self.keys.pop()
+        if position < len(self.keys):
+            self.keys[position] = last
+            self._index[last] = position
+        self._alias = None
+        return True
+
+    def set_weights(self, weight_fn):
+        """Sets a key -> weight function that skews every draw, or None for uniform."""
+        self._weight_fn = weight_fn
+        self._alias = None
+
+    def _build_alias(self):
+        """Builds a Vose alias table so weighted draws cost O(1)."""
+        count = len(self.keys)
+        weights = [float(self._weight_fn(key)) for key in self.keys]
+        total = sum(weights)
+        if total <= 0:
+            self._alias = None
+            return
+        scaled = [w * count / total for w in weights]
+        prob = [0.0] * count
+        alias = [0] * count
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in large + small:
+            prob[i] = 1.0
+        self._alias = (prob, alias)
+
+    def _draw(self):
+        if self._weight_fn is not None:
+            if self._alias is None:
+                self._build_alias()
+            if self._alias is not None:
+                prob, alias = self._alias
+                i = random.randrange(len(self.keys))
+                return self.keys[i] if random.random() < prob[i] else self.keys[alias[i]]
+        return self.keys[random.randrange(len(self.keys))]
+
+    def sample(self, exclude=None, max_rejections=32):
+        """Returns a random key not in `exclude`, or None if no key qualifies."""
+        if not self.keys:
+            return None
+        if exclude is None:
+            return self._draw()
+        if not isinstance(exclude, (set, frozenset, dict)):
+            exclude = {exclude}
+        for _ in range(max_rejections):
+            key = self._draw()
+            if key not in exclude:
+                return key
+        candidates = [key for key in self.keys if key not in exclude]
+        if not candidates:
+            return None
+        if self._weight_fn is not None:
+            return random.choices(
+                candidates, weights=[self._weight_fn(k) for k in candidates]
+            )[0]
+        return random.choice(candidates)
+
+
+class KeyPoolRegistry:
+    """Per-model key pools kept in step with the rows flushed by a session.
+
+    Keys flushed inside a SAVEPOINT (session.begin_nested) are reverted when
+    that savepoint rolls back, while keys from before it are kept.
+    """
+
+    def __init__(self):
+        self.session = None
+        self._pools = {}
+        self._pending = []
+        self._loaded_in_transaction = set()
+        self._savepoints = []
+
+    def bind(self, session):
+        """Attaches the registry to a session and drops any previously loaded keys."""
+        if self.session is not None:
+            self._unlisten(self.session)
+        self.session = session
+        self.reset()
+        if session is None:
+            return
+        for name, fn in self._listeners():
+            event.listen(session, name, fn)
+
+    def _listeners(self):
+        return (
+            ("after_flush", self._after_flush),
+            ("after_commit", self._after_commit),
+            ("after_rollback", self._after_rollback),
+            ("after_transaction_create", self._after_transaction_create),
+            ("after_transaction_end", self._after_transaction_end),
+        )
+
+    def _unlisten(self, session):
+        for name, fn in self._listeners():
+            if event.contains(session, name, fn):
+                event.remove(session, name, fn)
+
+    def reset(self):
+        self._pools = {}
+        self._pending = []
+        self._loaded_in_transaction = set()
+        self._savepoints = []
+
+    def invalidate(self, model):
+        """Forces the next access to reload the model's keys from the database."""
+        if model in self._pools:
+            self._pools[model].clear()
+
+    def pool(self, model):
+        """Returns the pool for a model, loading it on first use."""
+        pool = self._pools.get(model)
+        if pool is None:
+            pool = self._pools[model] = KeyPool(model)
+        if not pool.loaded and self.session is not None:
+            pool.load(self.session)
+            self._loaded_in_transaction.add(pool)
+        return pool
+
+    def add_keys(self, model, keys):
+        """Registers keys of rows written without a session, e.g. straight to files."""
+        pool = self._pools.get(model)
+        if pool is None:
+            pool = self._pools[model] = KeyPool(model)
+        pool.loaded = True
+        for key in keys:
+            pool.add(key)
+
+    def sample(self, model, exclude=None):
+        return self.pool(model).sample(exclude=exclude)
+
+    def _after_flush(self, session, flush_context):
+        for obj in session.new:
+            pool = self._pools.get(type(obj))
+            if pool is not None and pool.loaded:
+                key = getattr(obj, pool.attr)
+                if pool.add(key):
+                    self._pending.append((pool, key, True))
+        for obj in session.deleted:
+            pool = self._pools.get(type(obj))
+            if pool is not None and pool.loaded:
+                key = getattr(obj, pool.attr)
+                if pool.discard(key):
+                    self._pending.append((pool, key, False))
+
+    def _after_transaction_create(self, session, transaction):
+        if transaction.nested:
+            self._savepoints.append((len(self._pending), set(self._loaded_in_transaction)))
+
+    def _after_transaction_end(self, session, transaction):
+        if transaction.nested and self._savepoints:
+            self._savepoints.pop()
+
+    def _after_commit(self, session):
+        # Releasing a savepoint keeps its keys pending until the outer commit.
+        if session.in_nested_transaction():
+            return
+        self._pending = []
+        self._loaded_in_transaction = set()
+
+    def _after_rollback(self, session):
+        mark, loaded_before = 0, set()
+        if session.in_nested_transaction() and self._savepoints:
+            mark, loaded_before = self._savepoints[-1]
+        for pool, key, added in reversed(self._pending[mark:]):
+            if added:
+                pool.discard(key)
+            else:
+                pool.add(key)
+        # Pools loaded mid-transaction may hold uncommitted keys; reload them lazily.
+        for pool in self._loaded_in_transaction - loaded_before:
+            pool.clear()
+        del self._pending[mark:]
+        self._loaded_in_transaction = loaded_before
+
+
+key_pools = KeyPoolRegistry()
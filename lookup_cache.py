@@ -0,0 +1,90 @@
+import random
+from collections import namedtuple
+
+from sqlalchemy import inspect
+
+
+class LookupCache:
+    """Read-through cache of small lookup tables, keyed by model and name.
+
+    Rows are held as immutable named tuples of their column values rather
+    than ORM instances, so they survive commits and expunges and can be
+    shared by every factory without further queries.
+    """
+
+    def __init__(self):
+        self.session = None
+        self._record_types = {}
+        self._rows = {}
+        self._by_name = {}
+
+    def bind(self, session):
+        self.session = session
+        self.invalidate()
+
+    def invalidate(self, *models):
+        """Drops the cached rows of `models`, or of every model when none are given."""
+        for model in models or list(self._rows):
+            self._rows.pop(model, None)
+            self._by_name.pop(model, None)
+
+    def warm(self, *models):
+        for model in models:
+            self._load(model)
+
+    def _record_type(self, model):
+        record_type = self._record_types.get(model)
+        if record_type is None:
+            attrs = [attr.key for attr in inspect(model).column_attrs]
+            record_type = namedtuple(f"{model.__name__}Record", attrs)
+            self._record_types[model] = record_type
+        return record_type
+
+    def _load(self, model):
+        record_type = self._record_type(model)
+        mapper = inspect(model)
+        query = self.session.query(
+            *[getattr(model, attr) for attr in record_type._fields]
+        ).order_by(*mapper.primary_key)
+        rows = [record_type(*row) for row in query]
+        self._rows[model] = rows
+        by_name = {}
+        for row in rows:
+            by_name.setdefault(getattr(row, "name", None), row)
+        self._by_name[model] = by_name
+        return rows
+
+    def add(self, model, obj):
+        """Caches a row written without a session, e.g. straight to files."""
+        record = self._record_type(model)(
+            *[getattr(obj, attr) for attr in self._record_type(model)._fields]
+        )
+        self._rows.setdefault(model, []).append(record)
+        self._by_name.setdefault(model, {}).setdefault(getattr(record, "name", None), record)
+
+    def all(self, model):
+        rows = self._rows.get(model)
+        if rows is None and self.session is not None:
+            rows = self._load(model)
+        return rows or []
+
+    def get(self, model, name):
+        """Returns the cached row with the given name.
+
+        The table is loaded once; a name missing from it raises without
+        another query until the model is invalidated.
+        """
+        self.all(model)
+        row = self._by_name.get(model, {}).get(name)
+        if row is None:
+            raise LookupError(
+                f"No {model.__name__} named {name!r}; seed it before its dependants."
+            )
+        return row
+
+    def random(self, model):
+        rows = self.all(model)
+        return random.choice(rows) if rows else None
+
+
+lookups = LookupCache()
@@ -1,4 +1,33 @@
+from config import APPEND, DEFER_CONSTRAINTS, OUTPUT, OUTPUT_DIR, SEED, SNAPSHOT
+from database import Base, engine
 from seed import run_seeder
 
+
+def seed_with_snapshot():
+    """Restores the dataset from a matching snapshot, or seeds it and saves one."""
+    from snapshot import SnapshotCache, snapshot_key
+
+    if SEED is None or APPEND:
+        print("Snapshots need a fixed seed and a fresh run; seeding without one.")
+        run_seeder()
+        return
+    cache = SnapshotCache(Base.metadata)
+    key = snapshot_key(Base.metadata)
+    if cache.restore(engine, key, DEFER_CONSTRAINTS):
+        return
+    if run_seeder():
+        cache.save(engine, key)
+
+
 if __name__ == '__main__':
-    run_seeder()
+    if OUTPUT == "database" and SNAPSHOT:
+        seed_with_snapshot()
+    elif OUTPUT == "database":
+        run_seeder()
+    else:
+        from export import export_dataset
+        from writers import create_writer
+
+        export_dataset(
+            create_writer(OUTPUT, OUTPUT_DIR, engine, DEFER_CONSTRAINTS)
+        )
@@ -0,0 +1,55 @@
+import random
+from collections import defaultdict
+
+import models
+
+
+class PartnerMatcher:
+    """Matches businesses with complementary partners entirely in memory.
+
+    A complementary partner has the same business type but a different
+    business category. Within each type, business ids are stored sorted by
+    category, so the ids sharing a business's category form one contiguous
+    slice that can be skipped with index arithmetic instead of rejection.
+    """
+
+    def __init__(self, rows):
+        groups = defaultdict(list)
+        for business_id, type_id, category_id in rows:
+            if type_id is not None:
+                groups[type_id].append((category_id, business_id))
+
+        self._groups = {}
+        self._slots = {}
+        for type_id, members in groups.items():
+            members.sort(key=lambda m: (m[0] is None, m[0], m[1]))
+            ids = [business_id for _, business_id in members]
+            self._groups[type_id] = ids
+            bounds = {}
+            for position, (category_id, _) in enumerate(members):
+                low, _ = bounds.get(category_id, (position, position))
+                bounds[category_id] = (low, position + 1)
+            for category_id, business_id in members:
+                self._slots[business_id] = (type_id, bounds[category_id])
+        self.business_ids = sorted(self._slots)
+
+    @classmethod
+    def load(cls, session):
+        """Builds the matcher from a single query over businesses."""
+        rows = session.query(
+            models.Business.id,
+            models.Business.business_type_id,
+            models.Business.business_category_id,
+        ).order_by(models.Business.id)
+        return cls(rows)
+
+    def sample(self, business_id, degree=1):
+        """Returns up to `degree` distinct complementary partner ids for a business."""
+        slot = self._slots.get(business_id)
+        if slot is None:
+            return []
+        type_id, (low, high) = slot
+        ids = self._groups[type_id]
+        available = len(ids) - (high - low)
+        picks = random.sample(range(available), min(degree, available))
+        return [ids[i] if i < low else ids[i + high - low] for i in picks]
@@ -1,9 +1,8 @@
-from sqlalchemy import BINARY as Binary
 from sqlalchemy.orm import relationship
 from database import Base
 from sqlalchemy import (
     Column, Integer, String, ForeignKey, DECIMAL, Text, Date,
-    DateTime, Boolean, Enum, LargeBinary, CHAR
+    DateTime, Boolean, Enum, LargeBinary, CHAR, VARBINARY
 )
 
 
@@ -180,7 +179,7 @@ class UserLogin(Base):
     __tablename__ = 'user_logins'
     user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
     login_email = Column(String(254))
-    password_hash = Column(Binary(70))
+    password_hash = Column(VARBINARY(128))
     password_reset_token = Column(LargeBinary)
     password_reset_requested_timestamp = Column(DateTime)
 
@@ -0,0 +1,116 @@
+import multiprocessing
+import time
+from collections import deque
+
+from tqdm import tqdm
+
+import factories
+import pipeline
+from database import Base, engine, new_session_factory
+from instrumentation import stats
+from staging import StagingStore
+from write_queue import WriteQueues
+
+
+_worker_session = None
+
+
+def supports_parallel(engine):
+    """In-memory SQLite databases cannot be shared between processes."""
+    url = engine.url
+    return not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"))
+
+
+def _init_worker():
+    """Gives each worker process its own engine, session and key pools."""
+    global _worker_session
+    _worker_session = new_session_factory()()
+    factories.bind_session(_worker_session)
+
+
+def _seed_chunk(window):
+    start, count = window
+    started = time.perf_counter()
+    with stats.scope("Users"):
+        rows = pipeline.persist_user_chunk(_worker_session, start, count)
+    return count, rows, time.perf_counter() - started, stats.drain()
+
+
+def seed_users_parallel(total, chunk_size, workers, offset=0):
+    """Seeds users and their 1-to-1 entities across a process pool.
+
+    The user id range is split into the same chunks as the serial pipeline,
+    and every chunk owns its user ids and the matching Business, Idea and
+    UserPost ids, so workers never contend for keys. User ids start after
+    `offset`.
+    """
+    rates = []
+    rows = 0
+    windows = list(pipeline.iter_chunks(total, chunk_size, offset))
+    pbar = tqdm(total=total, desc=f"Creating users on {workers} workers")
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        for count, chunk_rows, elapsed, snapshot in pool.imap_unordered(_seed_chunk, windows):
+            stats.merge(snapshot)
+            rows += chunk_rows
+            rates.append(chunk_rows / elapsed if elapsed else float("inf"))
+            pbar.set_postfix_str(f"{rates[-1]:,.0f} rows/s")
+            pbar.update(count)
+    pbar.close()
+
+    pipeline.report_chunk_rates(rows, rates)
+    return rates
+
+
+def _stage_chunk(window):
+    start, count = window
+    started = time.perf_counter()
+    with stats.scope("Users"):
+        store = pipeline.stage_user_chunk(StagingStore(Base.metadata), start, count)
+        rows = len(store)
+        tables = store.drain()
+    # The lookups read here opened a transaction; end it so the writers can lock.
+    _worker_session.commit()
+    return count, rows, tables, time.perf_counter() - started, stats.drain()
+
+
+def seed_users_pipelined(total, chunk_size, workers, queue_size, offset=0):
+    """Generates user chunks in a process pool and writes them from one thread per table.
+
+    Workers only build plain row tuples; each table's writer thread
+    bulk-inserts its batches over its own pooled connection while the
+    workers carry on. At most 2 x workers chunks are generated ahead of
+    the writers, and a table queue holds at most queue_size batches, so
+    memory stays bounded. Queue depths and waits are printed at the end.
+    """
+    rates = []
+    rows = 0
+    windows = list(pipeline.iter_chunks(total, chunk_size, offset))
+    queues = WriteQueues(engine, Base.metadata, queue_size)
+    pbar = tqdm(total=total, desc=f"Generating users on {workers} workers")
+
+    def write(result):
+        nonlocal rows
+        count, chunk_rows, tables, elapsed, snapshot = result.get()
+        stats.merge(snapshot)
+        queues.put_chunk(tables)
+        rows += chunk_rows
+        rates.append(chunk_rows / elapsed if elapsed else float("inf"))
+        pbar.set_postfix_str(f"{rates[-1]:,.0f} rows/s")
+        pbar.update(count)
+
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            pending = deque()
+            for window in windows:
+                pending.append(pool.apply_async(_stage_chunk, (window,)))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft())
+            while pending:
+                write(pending.popleft())
+    finally:
+        pbar.close()
+        queues.close()
+    queues.report()
+
+    pipeline.report_chunk_rates(rows, rates)
+    return rates
@@ -0,0 +1,123 @@
+import time
+
+from tqdm import tqdm
+
+import factories
+from config import STAGING
+from database import Base
+from seeding import reseed
+from staging import StagingStore
+
+
+def iter_chunks(total, chunk_size, offset=0):
+    """Yields (start, count) windows that cover range(offset, offset + total) in chunk_size steps."""
+    for start in range(0, total, chunk_size):
+        yield offset + start, min(chunk_size, total - start)
+
+
+def build_user_entities(user):
+    """Builds the 1-to-1 entities that hang off a single user.
+
+    Entities with their own surrogate key reuse the user's id, so a user id
+    range also fixes the id range of every dependent row.
+    """
+    return [
+        factories.BusinessFactory.build(id=user.id, operator=user),
+        factories.UserLoginFactory.build(user=user),
+        # Cycle ideas by user id rather than IdeaFactory's process-local iterator.
+        factories.IdeaFactory.build(
+            id=user.id,
+            submitter=user,
+            content=factories.idea_list[(user.id - 1) % len(factories.idea_list)],
+        ),
+        factories.UserPostFactory.build(id=user.id, poster=user),
+        factories.UserSubscriptionFactory.build(user=user),
+    ]
+
+
+def generate_user_chunk(start, count):
+    """Builds users with ids start+1..start+count and their 1-to-1 entities.
+
+    Every user row reseeds its own random stream, so the output is identical
+    for any chunk boundaries or worker assignment.
+    """
+    users, entities = [], []
+    for user_id in range(start + 1, start + count + 1):
+        reseed("users", user_id)
+        user = factories.UserFactory.build(id=user_id)
+        users.append(user)
+        entities.extend(build_user_entities(user))
+    return users, entities
+
+
+def stage_user_chunk(store, start, count):
+    """Emits users start+1..start+count and their 1-to-1 rows into a StagingStore.
+
+    Same declarations and seed streams as generate_user_chunk, so the rows
+    are identical, but no ORM instances are created.
+    """
+    for user_id in range(start + 1, start + count + 1):
+        reseed("users", user_id)
+        user = store.emit(factories.UserFactory, id=user_id)
+        store.emit(factories.BusinessFactory, id=user_id, operator=user)
+        store.emit(factories.UserLoginFactory, user=user)
+        store.emit(
+            factories.IdeaFactory,
+            id=user_id,
+            submitter=user,
+            content=factories.idea_list[(user_id - 1) % len(factories.idea_list)],
+        )
+        store.emit(factories.UserPostFactory, id=user_id, poster=user)
+        store.emit(factories.UserSubscriptionFactory, user=user)
+    return store
+
+
+def persist_user_chunk(session, start, count):
+    """Generates, commits and releases one chunk of users; returns the row count."""
+    if STAGING:
+        store = stage_user_chunk(StagingStore(Base.metadata), start, count)
+        rows = len(store)
+        store.flush_to(session.connection())
+        session.commit()
+        return rows
+    users, entities = generate_user_chunk(start, count)
+    session.add_all(users)
+    session.add_all(entities)
+    session.flush()
+    session.commit()
+    session.expunge_all()
+    return len(users) + len(entities)
+
+
+def stream_user_entities(session, total, chunk_size, offset=0):
+    """Persists users and their dependents chunk by chunk, keeping the session small.
+
+    Each chunk is flushed, committed and expunged before the next one is
+    generated, so peak memory depends on chunk_size rather than total.
+    User ids start after `offset`. Returns the rows/sec measured for every chunk.
+    """
+    rates = []
+    pbar = tqdm(total=total, desc="Creating users and user-specific entities")
+    started = time.perf_counter()
+    rows = 0
+    for start, count in iter_chunks(total, chunk_size, offset):
+        chunk_rows = persist_user_chunk(session, start, count)
+
+        elapsed = time.perf_counter() - started
+        rows += chunk_rows
+        rates.append(chunk_rows / elapsed if elapsed else float("inf"))
+        pbar.set_postfix_str(f"{rates[-1]:,.0f} rows/s")
+        pbar.update(count)
+        started = time.perf_counter()
+    pbar.close()
+
+    report_chunk_rates(rows, rates)
+    return rates
+
+
+def report_chunk_rates(rows, rates):
+    if rates:
+        print(
+            f"Saved {rows} rows in {len(rates)} chunks "
+            f"(min {min(rates):,.0f}, max {max(rates):,.0f} rows/s)."
+        )
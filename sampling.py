@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# Above this fraction of the pair space a dense permutation beats Floyd's set.
+DENSE_FRACTION = 0.25
+
+
+def _floyd(space, num, rng):
+    """Robert Floyd's algorithm: `num` distinct integers from range(space) in `num` steps."""
+    chosen = set()
+    draws = rng.integers(0, np.arange(space - num + 1, space + 1, dtype=np.int64))
+    for j, t in zip(range(space - num, space), draws.tolist()):
+        chosen.add(j if t in chosen else t)
+    return np.fromiter(chosen, dtype=np.int64, count=num)
+
+
+def sample_without_replacement(space, num, rng, exclude=None):
+    """Draws `num` distinct integers from range(space), skipping any value in `exclude`."""
+    excluded = (
+        np.unique(np.asarray(exclude, dtype=np.int64))
+        if exclude is not None
+        else np.empty(0, dtype=np.int64)
+    )
+    free = space - len(excluded)
+    num = max(0, min(num, free))
+    if num == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if num >= free * DENSE_FRACTION:
+        picked = rng.permutation(free)[:num]
+    else:
+        picked = _floyd(free, num, rng)
+        rng.shuffle(picked)
+
+    if len(excluded):
+        # Map ranks in the free space back onto range(space) around the excluded values.
+        gaps = excluded - np.arange(len(excluded), dtype=np.int64)
+        picked = picked + np.searchsorted(gaps, picked, side="right")
+    return picked
+
+
+def sample_unique_pairs(n_left, n_right, num, rng, exclude=None):
+    """Returns (left_idx, right_idx) arrays of `num` distinct pairs from an n_left x n_right grid.
+
+    At most n_left * n_right pairs exist, so fewer are returned when the grid
+    is smaller than `num`. `exclude` is an optional (left_idx, right_idx)
+    pair of arrays that must not be drawn again.
+    """
+    space = n_left * n_right
+    flat_exclude = None
+    if exclude is not None:
+        left_ex, right_ex = exclude
+        flat_exclude = np.asarray(left_ex, dtype=np.int64) * n_right + np.asarray(
+            right_ex, dtype=np.int64
+        )
+    flat = sample_without_replacement(space, num, rng, exclude=flat_exclude)
+    return flat // max(n_right, 1), flat % max(n_right, 1)
@@ -0,0 +1,98 @@
+import numpy as np
+
+from config import SCALE
+
+
+def table_count(table_name, default, size):
+    """Rows to generate for a table: the scale profile's count or ratio, else `default`.
+
+    An integer in [scale.tables] is an absolute row count; a float is a
+    ratio of data_generation_size.
+    """
+    value = SCALE.get("tables", {}).get(table_name)
+    if value is None:
+        return default
+    if isinstance(value, float):
+        return int(size * value)
+    return int(value)
+
+
+def degree_spec(table_name, column_name):
+    """Returns the [scale.degrees] distribution for one foreign key column, or None."""
+    spec = SCALE.get("degrees", {}).get(table_name, {}).get(column_name)
+    if spec is None or spec.get("distribution", "uniform") == "uniform":
+        return None
+    return spec
+
+
+def key_weights(spec, count, rng):
+    """Returns normalized per-key weights for a degree distribution, or None for uniform.
+
+    zipf gives the key of rank r a weight of r ** -a, with ranks shuffled so
+    hubs are spread over the key range; normal draws each key's weight
+    from N(mean, std), clipped at zero.
+    """
+    if spec is None or count == 0:
+        return None
+    distribution = spec.get("distribution", "uniform")
+    if distribution == "zipf":
+        ranks = rng.permutation(count) + 1
+        weights = ranks.astype(np.float64) ** -float(spec.get("a", 1.5))
+    elif distribution == "normal":
+        weights = np.clip(
+            rng.normal(float(spec.get("mean", 1.0)), float(spec.get("std", 0.5)), count),
+            0.0,
+            None,
+        )
+    elif distribution == "uniform":
+        return None
+    else:
+        raise ValueError(
+            f"Unknown distribution '{distribution}'; expected uniform, zipf or normal."
+        )
+    total = weights.sum()
+    return weights / total if total > 0 else None
+
+
+def sample_weighted_pairs(left_weights, right_weights, n_left, n_right, num, rng, exclude=None):
+    """Draws up to `num` distinct (left, right) index pairs with skewed key popularity.
+
+    Each side is drawn from its weights (None is uniform) in vectorized
+    rounds; duplicates and excluded pairs are dropped, keeping draw order,
+    until `num` pairs are found or the rounds stop adding new pairs.
+    """
+    space = n_left * n_right
+    excluded = np.empty(0, dtype=np.int64)
+    if exclude is not None:
+        excluded = np.asarray(exclude[0], dtype=np.int64) * n_right + np.asarray(
+            exclude[1], dtype=np.int64
+        )
+    num = max(0, min(num, space - len(np.unique(excluded))))
+    chosen = np.empty(0, dtype=np.int64)
+
+    while len(chosen) < num:
+        draw = 2 * (num - len(chosen)) + 16
+        left = rng.choice(n_left, draw, p=left_weights)
+        right = rng.choice(n_right, draw, p=right_weights)
+        flat = np.concatenate([chosen, left.astype(np.int64) * n_right + right])
+        flat = flat[~np.isin(flat, excluded)]
+        _, first = np.unique(flat, return_index=True)
+        found = flat[np.sort(first)][:num]
+        if len(found) == len(chosen):
+            break  # The skew leaves no reachable pairs.
+        chosen = found
+    return chosen // max(n_right, 1), chosen % max(n_right, 1)
+
+
+def connection_degrees(business_ids, mean_degree, rng):
+    """Returns each business's number of outgoing connections.
+
+    Uniform profiles give every business `mean_degree`; skewed ones split
+    the same total over businesses by the business_connections degree
+    distribution, producing hubs.
+    """
+    spec = degree_spec("business_connections", "initiating_business_id")
+    weights = key_weights(spec, len(business_ids), rng)
+    if weights is None:
+        return [mean_degree] * len(business_ids)
+    return rng.multinomial(mean_degree * len(business_ids), weights).tolist()
@@ -0,0 +1,158 @@
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import factories
+from database import new_session_factory
+from instrumentation import stats
+
+
+class SeedTask:
+    """One generation step: a name, the models it writes and a run(session) callable.
+
+    `reads` names models the step reads besides the foreign-key parents of
+    the ones it writes, e.g. a link table it expands.
+    """
+
+    def __init__(self, name, models, run, reads=()):
+        self.name = name
+        self.tables = {model.__table__ for model in models}
+        self.reads = {model.__table__ for model in reads}
+        self.run = run
+
+
+def factory_models(factory_class):
+    """Returns the factory's model plus every model its SubFactories create."""
+    found = [factory_class._meta.model]
+    for declaration in factory_class._meta.declarations.values():
+        if hasattr(declaration, "get_factory"):
+            for model in factory_models(declaration.get_factory()):
+                if model not in found:
+                    found.append(model)
+    return found
+
+
+def ancestor_tables(tables):
+    """Every table reachable from `tables` by following foreign keys."""
+    seen = set()
+    pending = list(tables)
+    while pending:
+        table = pending.pop()
+        for foreign_key in table.foreign_keys:
+            parent = foreign_key.column.table
+            if parent not in seen:
+                seen.add(parent)
+                pending.append(parent)
+    return seen
+
+
+def task_dependencies(tasks):
+    """Maps each task index to the earlier task indexes it has to wait for.
+
+    A task waits for every earlier task that writes one of its foreign-key
+    ancestor tables or the tables it reads, and for every earlier task
+    writing the same tables, so ids are assigned in the same order as a
+    serial run.
+    """
+    producers = defaultdict(list)
+    dependencies = {}
+    for index, task in enumerate(tasks):
+        needed = set()
+        for table in ancestor_tables(task.tables | task.reads) | task.tables | task.reads:
+            needed.update(producers[table])
+        dependencies[index] = needed
+        for table in task.tables:
+            producers[table].append(index)
+    return dependencies
+
+
+def critical_path(tasks, durations):
+    """Returns the longest chain of dependent task durations, in seconds."""
+    dependencies = task_dependencies(tasks)
+    finish = {}
+    for index in range(len(tasks)):
+        start = max((finish[d] for d in dependencies[index]), default=0.0)
+        finish[index] = start + durations.get(index, 0.0)
+    return max(finish.values(), default=0.0)
+
+
+def report(tasks, durations, wall_time):
+    print(
+        f"Ran {len(tasks)} tasks in {wall_time:.2f}s "
+        f"(sum of tasks {sum(durations.values()):.2f}s, "
+        f"critical path {critical_path(tasks, durations):.2f}s)."
+    )
+
+
+def run_task(task, session):
+    factories.reset_iterators()
+    started = time.perf_counter()
+    with stats.scope(task.name):
+        task.run(session)
+        # End the task's transaction, which holds SQLite's write lock.
+        session.commit()
+    return time.perf_counter() - started
+
+
+def run_serially(tasks, session):
+    """Runs the tasks one after another on one session, in list order."""
+    durations = {}
+    started = time.perf_counter()
+    for index, task in enumerate(tasks):
+        print(f"\n{task.name}...")
+        durations[index] = run_task(task, session)
+    report(tasks, durations, time.perf_counter() - started)
+    return durations
+
+
+_worker_session_factory = None
+
+
+def _init_worker():
+    global _worker_session_factory
+    _worker_session_factory = new_session_factory()
+
+
+def _run_in_worker(build_tasks, args, index):
+    """Rebuilds the task list in the worker and runs one task on a fresh session."""
+    task = build_tasks(*args)[index]
+    session = _worker_session_factory()
+    try:
+        # Rebinding drops key pools and lookups cached by an earlier task.
+        factories.bind_session(session)
+        return run_task(task, session), stats.drain()
+    finally:
+        session.close()
+
+
+def run_concurrently(build_tasks, args, workers):
+    """Runs the tasks from build_tasks(*args) on a process pool as their dependencies finish.
+
+    Every task runs in a worker with its own engine connection and session,
+    so tables that do not depend on each other are generated in parallel and
+    the wall-clock time approaches the critical path.
+    """
+    tasks = build_tasks(*args)
+    dependencies = task_dependencies(tasks)
+    durations = {}
+    remaining = set(range(len(tasks)))
+    running = {}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        while remaining or running:
+            for index in sorted(remaining):
+                if dependencies[index] <= durations.keys():
+                    remaining.discard(index)
+                    print(f"Started {tasks[index].name}")
+                    future = pool.submit(_run_in_worker, build_tasks, args, index)
+                    running[future] = index
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                durations[index], snapshot = future.result()
+                stats.merge(snapshot)
+                print(f"Finished {tasks[index].name} in {durations[index]:.2f}s")
+
+    report(tasks, durations, time.perf_counter() - started)
+    return durations
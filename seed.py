@@ -1,30 +1,182 @@
+import cProfile
+import pstats
 import pycountry
+import bulk
+import constraints
+import credentials
+import parallel
+import pipeline
+import scheduler
 import models
 import factories
 import factory
 import random
+from functools import partial
+from sqlalchemy import func, insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import not_
 
-from factory.alchemy import SQLAlchemyModelFactory
 from tqdm import tqdm
-from config import DATA_GENERATION_SIZE
+from config import (
+    ACTIVITY_RATE,
+    APPEND,
+    BULK_LINK_TABLES,
+    CHUNK_SIZE,
+    COMMIT_EVERY,
+    CONNECTION_DEGREE,
+    CONNECTION_TYPES,
+    DATA_GENERATION_SIZE,
+    DEFER_CONSTRAINTS,
+    NOTIFICATIONS_PER_USER,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINED,
+    PROFILE_OUTPUT,
+    SCHEDULER_WORKERS,
+    TIMESERIES_DAYS,
+    WORKERS,
+)
 from database import engine, Base, SessionLocal
+from instrumentation import stats
+from key_pool import key_pools
+from lookup_cache import lookups
+from matching import PartnerMatcher
+from scale import connection_degrees, degree_spec, key_weights, table_count
+from scheduler import SeedTask, factory_models
+from seeding import numpy_rng, reseed
+from staging import ColumnStore
+from timeseries import block_count, iter_notification_blocks, iter_progress_blocks
 
 
-def seed_regions(session):
-    """Seeds the regions table from pycountry."""
-    session.query(models.Region).delete()
-    regions_to_add = [
+# Lookup tables the row export feeds into the lookup cache as it writes them.
+LOOKUP_MODELS = (
+    models.BusinessType,
+    models.BusinessCategory,
+    models.BusinessPhase,
+    models.ConnectionType,
+    models.Subscription,
+)
+
+
+def build_regions():
+    return [
         models.Region(id=country.alpha_3, name=country.name)
         for country in pycountry.countries
     ]
-    session.add_all(regions_to_add)
+
+
+def seed_regions(session):
+    """Seeds the regions table from pycountry."""
+    if APPEND:
+        # Projects may already reference regions, so only add the missing ones.
+        existing = {region_id for (region_id,) in session.query(models.Region.id)}
+        session.add_all(r for r in build_regions() if r.id not in existing)
+    else:
+        session.query(models.Region).delete()
+        session.add_all(build_regions())
     session.commit()
 
 
+def top_up(session, model, target):
+    """Returns (existing rows, rows still needed to reach target) for the model.
+
+    Outside append mode the tables were just recreated, so nothing exists.
+    """
+    if not APPEND:
+        return 0, target
+    existing = session.query(func.count()).select_from(model).scalar()
+    return existing, max(0, target - existing)
+
+
+def top_up_labels(existing, *labels):
+    """Seed labels for rows appended after `existing` ones; a fresh table keeps its labels."""
+    return labels + (existing,) if existing else labels
+
+
+def scaled(tasks, size):
+    """Applies the scale profile's row counts to (description, factory, count) tasks."""
+    return [
+        (
+            description,
+            factory_class,
+            table_count(factory_class._meta.model.__tablename__, num, size),
+        )
+        for description, factory_class, num in tasks
+    ]
+
+
+def independent_tasks(size):
+    """Lookup and other parent-less tables as (description, factory, count)."""
+    tasks = [
+        ("Business Categories", factories.BusinessCategoryFactory, int(size * 0.2)),
+        ("Business Phases", factories.BusinessPhaseFactory, 4),
+        ("Business Roles", factories.BusinessRoleFactory, 4),
+        ("Business Skills", factories.BusinessSkillFactory, 15),
+        ("Business Types", factories.BusinessTypeFactory, 4),
+        ("Connection Types", factories.ConnectionTypeFactory, 4),
+        ("Industry Categories", factories.IndustryCategoryFactory, int(size * 0.2)),
+        ("Mastermind Roles", factories.MastermindRoleFactory, 4),
+        ("Strength Categories", factories.StrengthCategoryFactory, 4),
+        ("Subscriptions", factories.SubscriptionFactory, 3),
+        ("Daily Activities", factories.DailyActivityFactory, int(size * 0.2)),
+        ("Skills", factories.SkillFactory, 50),
+        ("Strengths", factories.StrengthFactory, int(size * 0.2)),
+        # NEW: Create industries which will be linked to categories by the factory.
+        ("Industries", factories.IndustryFactory, int(size * 0.4)),
+    ]
+    scaled_tasks = []
+    for description, factory_class, num in scaled(tasks, size):
+        # Every user reads the lookup tables, so each one gets at least a row.
+        if factory_class._meta.model in LOOKUP_MODELS:
+            num = max(num, 1)
+        scaled_tasks.append((description, factory_class, num))
+    return scaled_tasks
+
+
+def many_to_many_tasks(size):
+    """Link tables and other late relationships as (description, factory, count)."""
+    tasks = [
+        ("Idea Votes", factories.IdeaVoteFactory, size * 2),
+        ("User Skills", factories.UserSkillFactory, size),
+        ("User Strengths", factories.UserStrengthFactory, size),
+        (
+            "Daily Activity Enrolments",
+            factories.DailyActivityEnrolmentFactory,
+            size,
+        ),
+        (
+            "Project Business Categories",
+            factories.ProjectBusinessCategoryFactory,
+            int(size * 0.6),
+        ),
+        (
+            "Project Business Skills",
+            factories.ProjectBusinessSkillFactory,
+            int(size * 0.6),
+        ),
+        ("Project Regions", factories.ProjectRegionFactory, int(size * 0.6)),
+        # NEW: Create BusinessStrengths which will be linked to BusinessRoles by the factory.
+        ("Business Strengths", factories.BusinessStrengthFactory, size),
+        # NEW: Create the links between connections and mastermind roles.
+        (
+            "Connection Mastermind Roles",
+            factories.ConnectionMastermindRoleFactory,
+            int(size * 0.5),
+        ),
+        ("Case Studies", factories.CaseStudyFactory, int(size * 0.2)),
+        (
+            "User Business Strengths",
+            factories.UserBusinessStrengthFactory,
+            size,
+        ),
+    ]
+    return scaled(tasks, size)
+
+
 def safe_create_batch(factory_class, num, session):
-    """Safely create batch of records handling potential duplicates."""
+    """Safely create batch of records handling potential duplicates.
+
+    Each row is flushed inside its own SAVEPOINT, so a duplicate only rolls
+    back that row and the rest of the session stays loaded.
+    """
     created = 0
     attempts = 0
     max_attempts = num * 3
@@ -32,12 +184,14 @@ def safe_create_batch(factory_class, num, session):
     pbar = tqdm(total=num, desc=f"Creating {factory_class._meta.model.__name__}")
     while created < num and attempts < max_attempts:
         try:
-            factory_class()
-            session.flush()
+            with session.begin_nested():
+                factory_class()
+                session.flush()
             created += 1
             pbar.update(1)
+            if COMMIT_EVERY and created % COMMIT_EVERY == 0:
+                session.commit()
         except IntegrityError:
-            session.rollback()
             attempts += 1
             continue
         except Exception:
@@ -52,142 +206,314 @@ def safe_create_batch(factory_class, num, session):
     return created
 
 
-def run_seeder():
-    """Seeds the database with structured, interconnected data."""
-    print("Initializing database...")
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
+def create_link_batch(factory_class, num, session, rng=None, existing=None):
+    """Creates link-table rows through the factory from pre-drawn unique key pairs."""
+    model = factory_class._meta.model
+    rng = rng if rng is not None else numpy_rng("links", model.__tablename__)
+    columns = bulk.draw_link_keys(model, num, rng, existing)
+    names = list(columns)
+    rows = list(zip(*columns.values()))
 
-    session = SessionLocal()
+    for count, values in enumerate(tqdm(rows, desc=f"Creating {model.__name__}"), 1):
+        factory_class(**dict(zip(names, values)))
+        if COMMIT_EVERY and count % COMMIT_EVERY == 0:
+            session.commit()
+    if len(rows) < num:
+        print(
+            f"Warning: Only {len(rows)}/{num} unique {model.__name__} key pairs exist."
+        )
+    return len(rows)
 
-    try:
-        for factory_class in SQLAlchemyModelFactory.__subclasses__():
-            factory_class._meta.sqlalchemy_session = session
-        if hasattr(factories, "fake"):
-            factories.fake.unique.clear()
 
-        size = DATA_GENERATION_SIZE
+def seed_independent_table(session, description, factory_class, num):
+    existing, num = top_up(session, factory_class._meta.model, num)
+    if num <= 0:
+        return
+    reseed(*top_up_labels(existing, "independent", description))
+    factory_class.create_batch(num)
+    session.commit()
+    lookups.invalidate(*factory_models(factory_class))
 
-        print("Seeding regions...")
-        seed_regions(session)
-
-        print("\nSeeding independent lookup tables...")
-        independent_tasks = [
-            ("Business Categories", factories.BusinessCategoryFactory, int(size * 0.2)),
-            ("Business Phases", factories.BusinessPhaseFactory, 4),
-            ("Business Roles", factories.BusinessRoleFactory, 4),
-            ("Business Skills", factories.BusinessSkillFactory, 15),
-            ("Business Types", factories.BusinessTypeFactory, 4),
-            ("Connection Types", factories.ConnectionTypeFactory, 4),
-            ("Industry Categories", factories.IndustryCategoryFactory, int(size * 0.2)),
-            ("Mastermind Roles", factories.MastermindRoleFactory, 4),
-            ("Strength Categories", factories.StrengthCategoryFactory, 4),
-            ("Subscriptions", factories.SubscriptionFactory, 3),
-            ("Daily Activities", factories.DailyActivityFactory, int(size * 0.2)),
-            ("Skills", factories.SkillFactory, 50),
-            # NEW: Create industries which will be linked to categories by the factory.
-            ("Industries", factories.IndustryFactory, int(size * 0.4)),
-        ]
-
-        for description, factory_class, num in tqdm(
-            independent_tasks, desc="Independent Tables"
-        ):
-            factory_class.create_batch(num)
-        session.commit()
-        print("Independent tables seeded.")
 
-        print(f"\nCreating {size} core User objects...")
-        users = factories.UserFactory.create_batch(size)
-        session.commit()
-        print("Users created and committed.")
-
-        print("\nBuilding 1-to-1 objects for each user (Businesses, Logins, etc)...")
-        objects_to_add = []
-        for user in tqdm(users, desc="Creating User-specific entities"):
-            objects_to_add.append(factories.BusinessFactory.build(operator=user))
-            objects_to_add.append(factories.UserLoginFactory.build(user=user))
-            objects_to_add.append(factories.IdeaFactory.build(submitter=user))
-            objects_to_add.append(factories.UserPostFactory.build(poster=user))
-            objects_to_add.append(factories.UserSubscriptionFactory.build(user=user))
-
-        print(f"Bulk saving {len(objects_to_add)} user-dependent objects...")
-        session.add_all(objects_to_add)
-        session.commit()
-        print("User-dependent objects saved.")
-
-        print("\nCreating secondary core objects like Projects...")
-        num_projects = int(size * 0.4)
-        project_managers = random.sample(users, min(len(users), num_projects))
-        projects = []
-        if project_managers:
-            projects = factories.ProjectFactory.create_batch(
-                len(project_managers), manager=factory.Iterator(project_managers)
-            )
-            session.commit()
-        print(f"{len(projects)} projects created.")
+def seed_users(session, size):
+    _, size = top_up(session, models.User, size)
+    if size <= 0:
+        return
+    offset = 0
+    if APPEND:
+        # Appended users continue after the highest id, with the same per-id seeds.
+        offset = session.query(func.max(models.User.id)).scalar() or 0
+    print(f"Creating {size} core User objects and their 1-to-1 objects...")
+    # The lookup tables are seeded by now; load them in one pass for the factories.
+    lookups.warm(*LOOKUP_MODELS)
+    # Release this session's transaction (and SQLite's write lock) before workers write.
+    session.commit()
+    if PIPELINED and parallel.supports_parallel(engine):
+        parallel.seed_users_pipelined(size, CHUNK_SIZE, WORKERS, PIPELINE_QUEUE_SIZE, offset)
+    elif WORKERS > 1 and parallel.supports_parallel(engine):
+        parallel.seed_users_parallel(size, CHUNK_SIZE, WORKERS, offset)
+    else:
+        pipeline.stream_user_entities(session, size, CHUNK_SIZE, offset)
+    # Users were written outside this session's flushes.
+    key_pools.invalidate(models.User)
 
-        print("\nBuilding logical and random relationships...")
 
-        print("Creating logical business connections...")
-        all_businesses = session.query(models.Business).all()
-        connections_to_add = []
-        connection_type = (
-            session.query(models.ConnectionType)
-            .filter(not_(models.ConnectionType.name.in_(["Investor", "Customer"])))
-            .first()
+def seed_projects(session, size):
+    existing, num_projects = top_up(
+        session, models.Project, table_count("projects", int(size * 0.4), size)
+    )
+    reseed(*top_up_labels(existing, "projects"))
+    managers = {
+        user_id
+        for (user_id,) in session.query(models.Project.managed_by_user_id).distinct()
+    }
+    user_ids = [key for key in key_pools.pool(models.User).keys if key not in managers]
+    manager_ids = random.sample(user_ids, min(len(user_ids), num_projects))
+    projects = []
+    if manager_ids:
+        projects = factories.ProjectFactory.create_batch(
+            len(manager_ids), managed_by_user_id=factory.Iterator(manager_ids)
         )
+        session.commit()
+    print(f"{len(projects)} projects created.")
 
-        for business in tqdm(all_businesses, desc="Finding Partners"):
-            partner = factories.get_complementary_business(session, business)
-            if partner and connection_type:
+
+def seed_connections(session):
+    connected = set()
+    if APPEND:
+        connected = {
+            business_id
+            for (business_id,) in session.query(
+                models.BusinessConnection.initiating_business_id
+            ).distinct()
+        }
+    reseed(*top_up_labels(len(connected), "connections"))
+    matcher = PartnerMatcher.load(session)
+    connection_type_ids = [
+        type_id
+        for (type_id,) in session.query(models.ConnectionType.id)
+        .filter(models.ConnectionType.name.in_(CONNECTION_TYPES))
+        .order_by(models.ConnectionType.id)
+    ]
+    connections_to_add = []
+    target = 0
+
+    if connection_type_ids:
+        # Appending only connects businesses that have no partners yet.
+        business_ids = [b for b in matcher.business_ids if b not in connected]
+        degrees = connection_degrees(
+            business_ids, CONNECTION_DEGREE, numpy_rng("connections", "degrees")
+        )
+        target = sum(degrees)
+        for business_id, degree in tqdm(
+            zip(business_ids, degrees), total=len(business_ids), desc="Finding Partners"
+        ):
+            for partner_id in matcher.sample(business_id, degree):
                 connections_to_add.append(
                     factories.BusinessConnectionFactory.build(
-                        initiating_business=business,
-                        receiving_business=partner,
-                        connection_type=connection_type,
+                        initiating_business_id=business_id,
+                        receiving_business_id=partner_id,
+                        connection_type_id=random.choice(connection_type_ids),
                     )
                 )
-        session.add_all(connections_to_add)
+    session.add_all(connections_to_add)
+    session.commit()
+    print(f"Created {len(connections_to_add)} logical business connections.")
+    warn_connection_shortfall(len(connections_to_add), target)
+
+
+def warn_connection_shortfall(created, target):
+    if created < target:
+        print(
+            f"Warning: Could only create {created}/{target} business connections; "
+            "some businesses have fewer complementary partners than their degree."
+        )
+
+
+def seed_relationship_table(session, factory_class, num):
+    model = factory_class._meta.model
+    existing, num = top_up(session, model, num)
+    if num <= 0:
+        return
+    labels = top_up_labels(existing, "links", model.__tablename__)
+    reseed(*labels)
+    if bulk.is_link_model(model):
+        # Pairs already in the table are excluded from the draw.
+        pairs = bulk.existing_link_keys(model, session) if existing else None
+        if BULK_LINK_TABLES:
+            bulk.bulk_create_links(model, num, session, numpy_rng(*labels), pairs)
+        else:
+            create_link_batch(factory_class, num, session, numpy_rng(*labels), pairs)
+    else:
+        with bulk.skewed_foreign_keys(model, numpy_rng(*labels, "degrees")):
+            safe_create_batch(factory_class, num, session)
+    session.commit()
+
+
+def insert_blocks(session, model, blocks, total, description):
+    """Inserts {column: array} blocks through a ColumnStore, committing each one."""
+    table = model.__table__
+    store = ColumnStore(table)
+    rows = 0
+    for columns in tqdm(blocks, total=total, desc=description):
+        store.extend(columns)
+        session.execute(insert(table), store.to_rows())
         session.commit()
-        print(f"Created {len(connections_to_add)} logical business connections.")
-
-        many_to_many_tasks = [
-            ("Idea Votes", factories.IdeaVoteFactory, size * 2),
-            ("User Skills", factories.UserSkillFactory, size),
-            ("User Strengths", factories.UserStrengthFactory, size),
-            (
-                "Daily Activity Enrolments",
-                factories.DailyActivityEnrolmentFactory,
-                size,
-            ),
-            (
-                "Project Business Categories",
-                factories.ProjectBusinessCategoryFactory,
-                int(size * 0.6),
-            ),
-            (
-                "Project Business Skills",
-                factories.ProjectBusinessSkillFactory,
-                int(size * 0.6),
-            ),
-            ("Project Regions", factories.ProjectRegionFactory, int(size * 0.6)),
-            # NEW: Create BusinessStrengths which will be linked to BusinessRoles by the factory.
-            ("Business Strengths", factories.BusinessStrengthFactory, size),
-            # NEW: Create the links between connections and mastermind roles.
-            (
-                "Connection Mastermind Roles",
-                factories.ConnectionMastermindRoleFactory,
-                int(size * 0.5),
-            ),
-        ]
-
-        for description, factory_class, num in many_to_many_tasks:
-            if num > 0:
-                safe_create_batch(factory_class, num, session)
-                session.commit()
+        rows += len(store)
+        store.clear()
+    return rows
+
+
+def seed_activity_progress(session):
+    """Daily progress rows for every activity enrolment over the time-series range."""
+    model = models.UserDailyActivityProgress
+    enrolments = bulk.existing_link_keys(models.DailyActivityEnrolment, session)
+    pairs = [tuple(pair) for pair in enrolments]
+    done = set()
+    if APPEND:
+        done = set(session.query(model.daily_activity_id, model.user_id).distinct())
+        pairs = [pair for pair in pairs if pair not in done]
+    blocks = iter_progress_blocks(
+        pairs,
+        TIMESERIES_DAYS,
+        factories.NOW.date(),
+        ACTIVITY_RATE,
+        top_up_labels(len(done), "progress"),
+    )
+    rows = insert_blocks(session, model, blocks, block_count(len(pairs)), "Daily Activity Progress")
+    print(f"Created {rows} daily activity progress rows.")
+
+
+def seed_notifications(session, size):
+    """Notification streams over the time-series range, skewed by the scale profile."""
+    model = models.Notification
+    existing, total = top_up(
+        session, model, table_count("notifications", size * NOTIFICATIONS_PER_USER, size)
+    )
+    if total <= 0:
+        return
+    labels = top_up_labels(existing, "notifications")
+    user_ids = key_pools.pool(models.User).keys
+    weights = key_weights(
+        degree_spec("notifications", "sender_user_id"),
+        len(user_ids),
+        numpy_rng(*labels, "weights"),
+    )
+    first_id = (session.query(func.max(model.id)).scalar() or 0) + 1
+    blocks = iter_notification_blocks(
+        user_ids,
+        total,
+        TIMESERIES_DAYS,
+        factories.NOW.date(),
+        weights,
+        first_id,
+        labels,
+    )
+    rows = insert_blocks(session, model, blocks, block_count(len(user_ids)), "Notifications")
+    print(f"Created {rows} notifications.")
+
+
+def seeding_tasks(size):
+    """Every generation step of run_seeder as a SeedTask, in serial order."""
+    tasks = [SeedTask("Regions", [models.Region], seed_regions)]
+    for description, factory_class, num in independent_tasks(size):
+        tasks.append(
+            SeedTask(
+                description,
+                factory_models(factory_class),
+                partial(
+                    seed_independent_table,
+                    description=description,
+                    factory_class=factory_class,
+                    num=num,
+                ),
+            )
+        )
+    tasks.append(
+        SeedTask(
+            "Users",
+            [
+                models.User,
+                models.Business,
+                models.UserLogin,
+                models.Idea,
+                models.UserPost,
+                models.UserSubscription,
+            ],
+            partial(seed_users, size=size),
+        )
+    )
+    tasks.append(SeedTask("Projects", [models.Project], partial(seed_projects, size=size)))
+    tasks.append(
+        SeedTask("Business Connections", [models.BusinessConnection], seed_connections)
+    )
+    for description, factory_class, num in many_to_many_tasks(size):
+        tasks.append(
+            SeedTask(
+                description,
+                factory_models(factory_class),
+                partial(seed_relationship_table, factory_class=factory_class, num=num),
+            )
+        )
+    tasks.append(
+        SeedTask(
+            "Daily Activity Progress",
+            [models.UserDailyActivityProgress],
+            seed_activity_progress,
+            reads=[models.DailyActivityEnrolment],
+        )
+    )
+    tasks.append(
+        SeedTask("Notifications", [models.Notification], partial(seed_notifications, size=size))
+    )
+    return tasks
+
+
+def run_seeder():
+    """Seeds the database with structured, interconnected data.
+
+    Returns True once every table has been generated.
+    """
+    if APPEND:
+        print("Topping up existing tables...")
+    else:
+        print("Initializing database...")
+        Base.metadata.drop_all(engine)
+    # Existing tables already carry their constraints, so appending never defers.
+    defer_constraints = DEFER_CONSTRAINTS and not APPEND
+    if defer_constraints:
+        constraints.create_tables_deferred(engine, Base.metadata.sorted_tables)
+    else:
+        Base.metadata.create_all(engine)
+
+    # bcrypt is slow; hash the test passwords before any worker holds a transaction.
+    credentials.test_passwords.warm()
+
+    session = SessionLocal()
+    profiler = cProfile.Profile() if PROFILE_OUTPUT else None
+    if profiler:
+        profiler.enable()
+
+    try:
+        factories.bind_session(session)
+        if hasattr(factories, "fake"):
+            factories.fake.unique.clear()
+
+        size = DATA_GENERATION_SIZE
+
+        if SCHEDULER_WORKERS > 1 and parallel.supports_parallel(engine):
+            print(f"Seeding tables on {SCHEDULER_WORKERS} scheduler workers...")
+            scheduler.run_concurrently(seeding_tasks, (size,), SCHEDULER_WORKERS)
+        else:
+            scheduler.run_serially(seeding_tasks(size), session)
+
+        if defer_constraints:
+            session.commit()
+            print("\nAdding deferred indexes and constraints...")
+            constraints.finalize_tables(engine, Base.metadata.sorted_tables)
 
-        print("Secondary objects and relationships saved.")
         print("\nData generation complete!")
+        return True
 
     except Exception as e:
         print(f"\nAn error occurred: {e}")
@@ -195,5 +521,12 @@ def run_seeder():
 
         traceback.print_exc()
         session.rollback()
+        return False
     finally:
         session.close()
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(PROFILE_OUTPUT)
+            print(f"\nProfile written to {PROFILE_OUTPUT}; top functions by cumulative time:")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+        stats.summary()
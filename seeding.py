@@ -0,0 +1,41 @@
+import hashlib
+import random
+from datetime import datetime, time
+
+import factory.random
+import faker.generator
+import numpy as np
+
+from config import REFERENCE_DATE, SEED
+
+
+def derive_seed(*labels):
+    """Derives a 64-bit sub-seed for the stream named by `labels` from the global seed."""
+    digest = hashlib.blake2b(repr((SEED,) + labels).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def reseed(*labels):
+    """Seeds random, Faker and factory_boy for one stream; a no-op without a global seed.
+
+    Streams are keyed by labels such as ("users", row_index), so a row's
+    values never depend on which chunk or worker generated it.
+    """
+    if SEED is None:
+        return
+    sub_seed = derive_seed(*labels)
+    random.seed(sub_seed)
+    faker.generator.random.seed(sub_seed)
+    factory.random.randgen.seed(sub_seed)
+
+
+def numpy_rng(*labels):
+    """Returns a NumPy generator for the named stream, unseeded without a global seed."""
+    return np.random.default_rng(None if SEED is None else derive_seed(*labels))
+
+
+def reference_time(tzinfo):
+    """Returns the instant generated timestamps are relative to: reference_date, or now."""
+    if REFERENCE_DATE is None:
+        return datetime.now(tzinfo)
+    return tzinfo.localize(datetime.combine(REFERENCE_DATE, time()))
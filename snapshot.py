@@ -0,0 +1,220 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import select, types
+from tqdm import tqdm
+
+import config
+import constraints
+from config import CHUNK_SIZE, SEED, SNAPSHOT_DIR
+from engine_profile import scan_options
+from writers import BINARY_TYPES, DatabaseWriter, JsonLinesWriter, LoadDataWriter
+
+
+# Settings that change how or where rows are written but not the rows themselves.
+NON_DATA_SETTINGS = {
+    "database_connection_string",
+    "workers",
+    "scheduler_workers",
+    "append",
+    "defer_constraints",
+    "instrument",
+    "profile_output",
+    "staging",
+    "output",
+    "output_dir",
+    "faker_pool_dir",
+    "snapshot",
+    "snapshot_dir",
+    "engine",
+}
+
+MANIFEST = "manifest.json"
+
+
+def schema_hash(metadata):
+    """Hashes the tables, columns, keys and indexes declared in models.py."""
+    schema = []
+    for table in metadata.sorted_tables:
+        schema.append(
+            {
+                "table": table.name,
+                "columns": [
+                    [
+                        column.name,
+                        repr(column.type),
+                        column.nullable,
+                        column.primary_key,
+                        sorted(fk.target_fullname for fk in column.foreign_keys),
+                    ]
+                    for column in table.columns
+                ],
+                "unique": [
+                    [c.name for c in constraint.columns]
+                    for constraint in constraints.unique_constraints(table)
+                ],
+                "indexes": sorted(
+                    [index.unique, [c.name for c in index.columns]] for index in table.indexes
+                ),
+            }
+        )
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+
+def snapshot_key(metadata, settings=None):
+    """Keys a dataset by schema hash, data-generating settings and seed.
+
+    Without a reference_date generated timestamps follow the clock, so
+    the current date is part of the key.
+    """
+    settings = config.config if settings is None else settings
+    data_settings = {k: v for k, v in settings.items() if k not in NON_DATA_SETTINGS}
+    if data_settings.get("reference_date") is None:
+        data_settings["reference_date"] = date.today()
+    payload = {
+        "schema": schema_hash(metadata),
+        "settings": data_settings,
+        "seed": settings.get("seed"),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class GzipJsonLinesWriter(JsonLinesWriter):
+    """JSON Lines writer with one gzip-compressed file per table."""
+
+    extension = "jsonl.gz"
+
+    def _file(self, table):
+        handle = self._files.get(table.name)
+        if handle is None:
+            handle = self._files[table.name] = gzip.open(
+                self.path(table), "wt", encoding="utf-8"
+            )
+        return handle
+
+
+def column_decoder(column_type):
+    """Converts a JSON Lines value back to the column's Python type, or None if unchanged."""
+    if isinstance(column_type, types.DateTime):
+        return datetime.fromisoformat
+    if isinstance(column_type, types.Date):
+        return date.fromisoformat
+    if isinstance(column_type, types.Numeric) and not isinstance(column_type, types.Float):
+        return Decimal
+    if isinstance(column_type, BINARY_TYPES):
+        return bytes.fromhex
+    return None
+
+
+class SnapshotCache:
+    """Compressed per-table dumps of seeded datasets under snapshot_dir, one per key."""
+
+    def __init__(self, metadata, directory=SNAPSHOT_DIR):
+        self.metadata = metadata
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def manifest(self, key):
+        """Returns the snapshot's manifest, or None if there is no complete snapshot."""
+        try:
+            with open(os.path.join(self.path(key), MANIFEST), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, engine, key, batch_size=CHUNK_SIZE):
+        """Dumps every table to the snapshot for `key`, replacing any older one."""
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.directory)
+        counts = {}
+        writer = GzipJsonLinesWriter(staging)
+        tables = self.metadata.sorted_tables
+        try:
+            writer.open(tables)
+            with engine.connect() as connection:
+                for table in tqdm(tables, desc="Writing snapshot"):
+                    query = select(table).order_by(*table.primary_key.columns)
+                    result = connection.execution_options(**scan_options()).execute(query)
+                    counts[table.name] = 0
+                    for batch in result.mappings().partitions(batch_size):
+                        writer.write(table, batch)
+                        counts[table.name] += len(batch)
+            writer.close()
+            manifest = {
+                "key": key,
+                "schema_hash": schema_hash(self.metadata),
+                "seed": SEED,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "tables": counts,
+            }
+            with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as handle:
+                json.dump(manifest, handle, indent=2)
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            os.replace(staging, self.path(key))
+        except BaseException:
+            writer.close()
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        print(f"Saved snapshot {key} ({sum(counts.values())} rows) to {self.path(key)}")
+
+    def restore(self, engine, key, defer_constraints=False, batch_size=CHUNK_SIZE):
+        """Recreates the tables and bulk-loads them from the snapshot for `key`.
+
+        Returns False without touching the database if the snapshot is
+        missing, incomplete or was taken with a different schema.
+        """
+        manifest = self.manifest(key)
+        if manifest is None:
+            return False
+        if manifest.get("schema_hash") != schema_hash(self.metadata):
+            print(f"Snapshot {key} was taken with a different schema in models.py; ignoring it.")
+            return False
+        tables = self.metadata.sorted_tables
+        paths = {
+            table: os.path.join(self.path(key), f"{table.name}.{GzipJsonLinesWriter.extension}")
+            for table in tables
+        }
+        missing = [table.name for table, path in paths.items() if not os.path.exists(path)]
+        if missing:
+            print(f"Snapshot {key} has no dump for {', '.join(missing)}; ignoring it.")
+            return False
+
+        started = time.perf_counter()
+        print(f"Restoring snapshot {key} from {manifest['created']}...")
+        if engine.dialect.name in ("mysql", "mariadb"):
+            writer = LoadDataWriter(engine, defer_constraints=defer_constraints)
+        else:
+            writer = DatabaseWriter(engine, defer_constraints=defer_constraints)
+        writer.open(tables)
+        for table in tqdm(tables, desc="Restoring tables"):
+            self._load(writer, table, paths[table], batch_size)
+        writer.close()
+        rows = sum(manifest["tables"].values())
+        print(f"Restored {rows} rows in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def _load(self, writer, table, path, batch_size):
+        decoders = {column.name: column_decoder(column.type) for column in table.columns}
+        decoders = {name: decode for name, decode in decoders.items() if decode is not None}
+        batch = []
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                row = json.loads(line)
+                for name, decode in decoders.items():
+                    if row[name] is not None:
+                        row[name] = decode(row[name])
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    writer.write(table, batch)
+                    batch = []
+        writer.write(table, batch)
@@ -0,0 +1,203 @@
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import factory
+import numpy as np
+from sqlalchemy import inspect, insert, types
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty
+
+
+def column_dtype(column_type):
+    """NumPy dtype holding a column's values; object for strings and bytes."""
+    if isinstance(column_type, types.Boolean):
+        return np.dtype(bool)
+    if isinstance(column_type, types.Integer):
+        return np.dtype(np.int64)
+    if isinstance(column_type, (types.Float, types.Numeric)):
+        return np.dtype(np.float64)
+    if isinstance(column_type, types.DateTime):
+        return np.dtype("datetime64[us]")
+    if isinstance(column_type, types.Date):
+        return np.dtype("datetime64[D]")
+    return np.dtype(object)
+
+
+def _stored(value):
+    # datetime64 has no time zone; keep the wall-clock time like the file writers.
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    # Staged rows may be pickled to another process, which memoryviews cannot be.
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    return value
+
+
+class ColumnStore:
+    """Rows of one table held column-wise, one typed NumPy array per column.
+
+    Numeric, boolean and timestamp columns cost a few bytes per row plus a
+    validity flag for NULLs; only strings and bytes remain Python objects.
+    Columns no row has set are left out of to_rows(), so the database
+    still assigns autoincrement keys.
+    """
+
+    def __init__(self, table, capacity=1024):
+        self.table = table
+        self.length = 0
+        self._capacity = capacity
+        self._values = {}
+        self._valid = {}
+        for column in table.columns:
+            dtype = column_dtype(column.type)
+            self._values[column.name] = np.empty(capacity, dtype=dtype)
+            self._valid[column.name] = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.length
+
+    def _reserve(self, extra):
+        needed = self.length + extra
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2)
+        for name in self._values:
+            values = np.empty(capacity, dtype=self._values[name].dtype)
+            values[: self.length] = self._values[name][: self.length]
+            valid = np.zeros(capacity, dtype=bool)
+            valid[: self.length] = self._valid[name][: self.length]
+            self._values[name], self._valid[name] = values, valid
+        self._capacity = capacity
+
+    def append(self, row):
+        """Adds one {column name: value} row; missing columns and None are NULL."""
+        self._reserve(1)
+        index = self.length
+        for name, value in row.items():
+            if value is not None:
+                self._values[name][index] = _stored(value)
+                self._valid[name][index] = True
+        self.length += 1
+
+    def extend(self, columns):
+        """Adds rows given as {column name: array-like}, all of the same length."""
+        count = len(next(iter(columns.values()))) if columns else 0
+        self._reserve(count)
+        end = self.length + count
+        for name, values in columns.items():
+            self._values[name][self.length : end] = values
+            self._valid[name][self.length : end] = True
+        self.length = end
+
+    def to_tuples(self):
+        """Returns (column names, row tuples) with plain Python values, e.g. to pickle."""
+        names, columns = [], []
+        for name, values in self._values.items():
+            valid = self._valid[name][: self.length]
+            if not valid.any():
+                continue
+            column = values[: self.length].tolist()
+            if not valid.all():
+                column = [v if ok else None for v, ok in zip(column, valid.tolist())]
+            names.append(name)
+            columns.append(column)
+        return names, list(zip(*columns))
+
+    def to_rows(self):
+        """Returns the rows as {column name: Python value} dicts for executemany or writers."""
+        names, rows = self.to_tuples()
+        return [dict(zip(names, values)) for values in rows]
+
+    def nbytes(self):
+        """Approximate memory held by the staged rows, including string payloads."""
+        total = 0
+        for name, values in self._values.items():
+            total += values[: self.length].nbytes + self.length
+            if values.dtype == object:
+                total += sum(
+                    sys.getsizeof(v) for v, ok in zip(values, self._valid[name]) if ok
+                )
+        return total
+
+    def clear(self):
+        self.length = 0
+        for valid in self._valid.values():
+            valid[:] = False
+
+
+class StagingStore:
+    """Column stores per table, flushed in foreign-key order."""
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self._stores = {}
+
+    def store(self, table):
+        store = self._stores.get(table)
+        if store is None:
+            store = self._stores[table] = ColumnStore(table)
+        return store
+
+    def emit(self, factory_class, **overrides):
+        """Evaluates a factory straight into a staged row, without an ORM instance.
+
+        Returns the row as an attribute namespace, so it can stand in for
+        the object in related factories (e.g. `operator=user`).
+        """
+        model = factory_class._meta.model
+        values = factory.build(dict, FACTORY_CLASS=factory_class, **overrides)
+        row = model_row(model, values)
+        self.store(model.__table__).append(row)
+        return SimpleNamespace(**values)
+
+    def __len__(self):
+        return sum(len(store) for store in self._stores.values())
+
+    def nbytes(self):
+        return sum(store.nbytes() for store in self._stores.values())
+
+    def flush(self, writer):
+        """Hands every staged table to a TableWriter and empties the store."""
+        for table in self.metadata.sorted_tables:
+            store = self._stores.get(table)
+            if store:
+                writer.write(table, store.to_rows())
+                store.clear()
+
+    def drain(self):
+        """Returns [(table name, column names, row tuples)] in foreign-key order and empties the store."""
+        tables = []
+        for table in self.metadata.sorted_tables:
+            store = self._stores.get(table)
+            if store:
+                tables.append((table.name, *store.to_tuples()))
+                store.clear()
+        return tables
+
+    def flush_to(self, connection):
+        """Inserts every staged table with one executemany each and empties the store."""
+        for table in self.metadata.sorted_tables:
+            store = self._stores.get(table)
+            if store:
+                connection.execute(insert(table), store.to_rows())
+                store.clear()
+
+
+def model_row(model, values):
+    """Maps factory attribute values to a {column name: value} row.
+
+    Many-to-one relationship values contribute their foreign keys; other
+    relationship values and non-column attributes are dropped.
+    """
+    mapper = inspect(model)
+    row = {}
+    for key, value in values.items():
+        prop = mapper.attrs.get(key)
+        if isinstance(prop, ColumnProperty):
+            row[prop.columns[0].name] = value
+        elif isinstance(prop, RelationshipProperty) and value is not None:
+            for local, remote in prop.local_remote_pairs:
+                if local.table is model.__table__:
+                    remote_key = inspect(prop.mapper).get_property_by_column(remote).key
+                    row[local.name] = getattr(value, remote_key)
+    return row
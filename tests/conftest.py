@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# config.py reads ./config.toml at import time, so point the modules under
+# test at a throwaway SQLite database before any of them is imported.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="seed-tests-")
+
+CONFIG = f"""\
+database_connection_string = "sqlite:///{os.path.join(WORKDIR, 'test.db')}"
+data_generation_size = 20
+seed = 42
+reference_date = 2026-01-01
+faker_pools = false
+faker_pool_size = 50
+faker_pool_dir = "{os.path.join(WORKDIR, 'faker_pools')}"
+password_hashes = "random"
+"""
+
+with open(os.path.join(WORKDIR, "config.toml"), "w", encoding="utf-8") as handle:
+    handle.write(CONFIG)
+os.chdir(WORKDIR)
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def session():
+    """A session on freshly created tables, bound to the factories and key pools."""
+    import factories
+    from database import Base, SessionLocal, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    factories.bind_session(session)
+    factories.reset_iterators()
+    yield session
+    session.rollback()
+    session.close()
+    factories.bind_session(None)
+
+
+@pytest.fixture
+def lookup_tables(session):
+    """Seeds the lookup tables that users and their 1-to-1 rows draw from."""
+    import factories
+
+    factories.BusinessTypeFactory.create_batch(4)
+    factories.BusinessCategoryFactory.create_batch(5)
+    factories.BusinessPhaseFactory.create_batch(4)
+    factories.SubscriptionFactory.create_batch(3)
+    session.commit()
+    return session
@@ -0,0 +1,56 @@
+import factories
+import models
+import scheduler
+import seed
+from database import Base, engine
+
+
+def seed_tables(session, size):
+    factories.bind_session(session)
+    scheduler.run_serially(seed.seeding_tasks(size), session)
+
+
+def user_rows(session):
+    return session.query(models.User.id, models.User.first_name, models.User.last_name).all()
+
+
+def test_top_up_counts_only_missing_rows(session, monkeypatch):
+    session.add_all(models.BusinessType(name=f"type {i}") for i in range(3))
+    session.commit()
+    assert seed.top_up(session, models.BusinessType, 5) == (0, 5)
+    monkeypatch.setattr(seed, "APPEND", True)
+    assert seed.top_up(session, models.BusinessType, 5) == (3, 2)
+    assert seed.top_up(session, models.BusinessType, 2) == (3, 0)
+    assert seed.top_up_labels(0, "users") == ("users",)
+    assert seed.top_up_labels(3, "users") == ("users", 3)
+
+
+def test_append_tops_tables_up_and_keeps_existing_rows(session, monkeypatch):
+    seed_tables(session, 3)
+    before = user_rows(session)
+    connections = session.query(models.BusinessConnection).count()
+
+    monkeypatch.setattr(seed, "APPEND", True)
+    seed_tables(session, 5)
+    after = user_rows(session)
+    assert after[:3] == before
+    assert [row.id for row in after] == [1, 2, 3, 4, 5]
+    assert session.query(models.Business).count() == 5
+    assert session.query(models.BusinessConnection).count() >= connections
+
+    seed_tables(session, 5)
+    assert user_rows(session) == after
+
+
+def test_appended_users_match_a_fresh_run(session, monkeypatch):
+    seed_tables(session, 2)
+    monkeypatch.setattr(seed, "APPEND", True)
+    seed_tables(session, 4)
+    appended = user_rows(session)
+
+    session.close()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(seed, "APPEND", False)
+    seed_tables(session, 4)
+    assert user_rows(session) == appended
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, Table, create_engine, func, select
+
+pytest.importorskip("aiosqlite")
+
+from async_writer import AsyncDatabaseWriter, async_url  # noqa: E402
+
+METADATA = MetaData()
+PARENTS = Table("parents", METADATA, Column("id", Integer, primary_key=True))
+CHILDREN = Table(
+    "children",
+    METADATA,
+    Column("id", Integer, primary_key=True),
+    Column("parent_id", ForeignKey("parents.id")),
+)
+
+
+def test_async_url_swaps_the_driver():
+    assert str(async_url("sqlite:///seed.db")) == "sqlite+aiosqlite:///seed.db"
+    assert async_url("mysql+pymysql://u@h/db").drivername == "mysql+asyncmy"
+    assert async_url("mysql://u@h/db", "aiomysql").drivername == "mysql+aiomysql"
+    with pytest.raises(ValueError, match="No asyncio driver"):
+        async_url("oracle://u@h/db")
+
+
+def test_in_memory_sqlite_is_rejected():
+    with pytest.raises(ValueError, match="in-memory"):
+        AsyncDatabaseWriter(create_engine("sqlite://"))
+
+
+def count(engine, table):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(table)).scalar()
+
+
+def test_batches_from_concurrent_writers_are_all_stored(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    writer = AsyncDatabaseWriter(engine, writers=3, queue_size=2, profile={})
+    writer.open(METADATA.sorted_tables)
+    for batch in range(10):
+        ids = range(batch * 5 + 1, batch * 5 + 6)
+        writer.write(PARENTS, [{"id": i} for i in ids])
+        writer.write(CHILDREN, [{"id": i, "parent_id": i} for i in ids])
+    writer.close()
+
+    assert writer.batches == 20
+    assert count(engine, PARENTS) == count(engine, CHILDREN) == 50
+
+
+def test_failed_batches_are_raised_on_close(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    writer = AsyncDatabaseWriter(engine, writers=2, profile={})
+    writer.open(METADATA.sorted_tables)
+    writer.write(PARENTS, [{"id": 1}])
+    writer.write(PARENTS, [{"id": 1}])
+    with pytest.raises(Exception, match="UNIQUE"):
+        writer.close()
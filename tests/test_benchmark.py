@@ -0,0 +1,21 @@
+import benchmark
+
+
+def test_factory_metrics_come_from_create_scopes():
+    snapshot = (
+        {"UserFactory": 4, "Users": 9},
+        {"UserFactory": 0.5, "Users": 1.0},
+        {"UserFactory._create": 2, "get_random_id": 10},
+        {"UserFactory._create": 0.25, "get_random_id": 0.1},
+        [],
+    )
+    assert benchmark.factory_metrics(snapshot) == {
+        "UserFactory": {
+            "creates": 2,
+            "seconds": 0.25,
+            "creates_per_sec": 8.0,
+            "queries": 4,
+            "db_seconds": 0.5,
+        }
+    }
+    assert benchmark.factory_metrics(None) == {}
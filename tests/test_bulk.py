@@ -0,0 +1,51 @@
+import numpy as np
+
+import bulk
+import models
+from key_pool import key_pools
+
+
+def seed_users_and_ideas(session, users=4, ideas=3):
+    session.add_all([models.User(id=i, first_name=f"user {i}") for i in range(1, users + 1)])
+    session.add_all([models.Idea(id=i, submitted_by_user_id=1) for i in range(1, ideas + 1)])
+    session.commit()
+
+
+def test_link_columns_detects_composite_key_tables():
+    (left, left_model), (right, right_model) = bulk.link_columns(models.IdeaVote)
+    assert (left.name, left_model) == ("voter_user_id", models.User)
+    assert (right.name, right_model) == ("idea_id", models.Idea)
+    assert not bulk.is_link_model(models.User)
+
+
+def test_bulk_create_links_inserts_unique_pairs(session):
+    seed_users_and_ideas(session)
+    created = bulk.bulk_create_links(models.IdeaVote, 8, session, np.random.default_rng(1))
+    session.commit()
+
+    pairs = session.query(models.IdeaVote.voter_user_id, models.IdeaVote.idea_id).all()
+    assert created == len(pairs) == len(set(pairs)) == 8
+    assert all(1 <= user <= 4 and 1 <= idea <= 3 for user, idea in pairs)
+    assert session.query(models.IdeaVote).filter(models.IdeaVote.type.is_(None)).count() == 0
+
+
+def test_bulk_create_links_stops_at_the_pair_space(session, capsys):
+    seed_users_and_ideas(session, users=2, ideas=2)
+    existing = [(1, 1)]
+    created = bulk.bulk_create_links(
+        models.IdeaVote, 10, session, np.random.default_rng(2), existing
+    )
+    assert created == 3
+    assert (1, 1) not in set(
+        session.query(models.IdeaVote.voter_user_id, models.IdeaVote.idea_id)
+    )
+    assert "Only 3/10 unique IdeaVote key pairs" in capsys.readouterr().out
+
+
+def test_build_link_rows_from_registered_keys():
+    key_pools.reset()
+    key_pools.add_keys(models.User, [10, 20])
+    key_pools.add_keys(models.Idea, [7])
+    rows = bulk.build_link_rows(models.IdeaVote, 5, np.random.default_rng(3))
+    key_pools.reset()
+    assert sorted((row["voter_user_id"], row["idea_id"]) for row in rows) == [(10, 7), (20, 7)]
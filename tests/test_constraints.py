@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    UniqueConstraint,
+    create_engine,
+    insert,
+    inspect,
+)
+from sqlalchemy.exc import IntegrityError
+
+import constraints
+
+
+@pytest.fixture
+def schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'deferred.db'}")
+    metadata = MetaData()
+    parents = Table("parents", metadata, Column("id", Integer, primary_key=True))
+    children = Table(
+        "children",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", Integer, ForeignKey("parents.id")),
+        Column("email", String(50), index=True),
+        UniqueConstraint("parent_id", "email"),
+    )
+    constraints.create_tables_deferred(engine, [parents, children])
+    yield engine, parents, children
+    engine.dispose()
+
+
+def load(engine, parents, children, rows):
+    with engine.begin() as connection:
+        connection.execute(insert(parents), [{"id": 1}, {"id": 2}])
+        connection.execute(insert(children), rows)
+
+
+def test_tables_are_created_without_unique_constraints_or_indexes(schema):
+    engine, _, _ = schema
+    inspector = inspect(engine)
+    assert inspector.get_unique_constraints("children") == []
+    assert inspector.get_indexes("children") == []
+
+
+def test_finalize_adds_the_deferred_constraints(schema):
+    engine, parents, children = schema
+    load(engine, parents, children, [{"id": 1, "parent_id": 1, "email": "a"}])
+    constraints.finalize_tables(engine, [parents, children])
+
+    assert len(inspect(engine).get_indexes("children")) == 2
+    with pytest.raises(IntegrityError):
+        with engine.begin() as connection:
+            connection.execute(insert(children), {"id": 2, "parent_id": 1, "email": "a"})
+
+
+def test_finalize_rejects_duplicates_and_orphans(schema):
+    engine, parents, children = schema
+    load(
+        engine,
+        parents,
+        children,
+        [
+            {"id": 1, "parent_id": 1, "email": "a"},
+            {"id": 2, "parent_id": 1, "email": "a"},
+            {"id": 3, "parent_id": 9, "email": "b"},
+        ],
+    )
+    with pytest.raises(ValueError) as error:
+        constraints.finalize_tables(engine, [parents, children])
+    assert "children(parent_id) -> parents: 1 orphaned rows" in str(error.value)
+    assert "children(parent_id, email) unique: 1 duplicate rows" in str(error.value)
@@ -0,0 +1,68 @@
+import base64
+import random
+
+import numpy as np
+import pytest
+
+import credentials
+from credentials import BASE64_ALPHABET, HashShapes, encode64, hash_block
+
+
+def test_encode64_matches_base64_without_padding():
+    raw = np.random.default_rng(1).integers(0, 256, (5, 16), dtype=np.uint8)
+    encoded = encode64(raw, BASE64_ALPHABET)
+    for row, chars in zip(raw, encoded):
+        assert chars.tobytes() == base64.b64encode(row.tobytes()).rstrip(b"=")
+
+
+@pytest.mark.parametrize(
+    "shape, prefix, length",
+    [
+        ("bcrypt", b"$2b$12$", 60),
+        ("argon2", b"$argon2id$v=19$m=65536,t=3,p=4$", 97),
+        ("sha256", b"$5$", 63),
+    ],
+)
+def test_hash_blocks_have_the_shape_of_real_hashes(shape, prefix, length):
+    block = hash_block(shape, 3, np.random.default_rng(2))
+    assert block.shape == (3, length)
+    hashes = [row.tobytes() for row in block]
+    assert all(value.startswith(prefix) for value in hashes)
+    assert len(set(hashes)) == 3
+
+
+def test_bcrypt_shaped_hashes_parse_as_bcrypt():
+    bcrypt = pytest.importorskip("bcrypt")
+    value = hash_block("bcrypt", 1, np.random.default_rng(3)).tobytes()
+    assert bcrypt.checkpw(b"password", value) is False
+
+
+def test_hashes_depend_only_on_the_user_id():
+    shapes = HashShapes("argon2", block_size=4)
+    forwards = [bytes(shapes.get(user_id)) for user_id in range(1, 11)]
+    fresh = HashShapes("argon2", block_size=4)
+    backwards = [bytes(fresh.get(user_id)) for user_id in range(10, 0, -1)]
+    assert forwards == backwards[::-1]
+    assert len(set(forwards)) == 10
+    assert isinstance(shapes.get(1), memoryview)
+    with pytest.raises(ValueError, match="Unknown password_hashes"):
+        HashShapes("md5")
+
+
+def test_test_passwords_get_real_hashes(monkeypatch, tmp_path):
+    bcrypt = pytest.importorskip("bcrypt")
+    monkeypatch.setattr(credentials, "BCRYPT_COST", 4)
+    pool = credentials.TestPasswordPool(["alpha", "beta"], every=10, size=2, directory=str(tmp_path))
+
+    assert pool.password(7) is None and pool.get(7) is None
+    assert [pool.password(user_id) for user_id in (10, 20, 30)] == ["beta", "alpha", "beta"]
+    assert bcrypt.checkpw(b"beta", pool.get(10))
+    cached = credentials.TestPasswordPool(["alpha", "beta"], every=10, size=2, directory=str(tmp_path))
+    assert cached.get(10) == pool.get(10)
+
+
+def test_random_password_hashes_follow_the_row_stream():
+    random.seed(4)
+    first = credentials.password_hash(5)
+    random.seed(4)
+    assert credentials.password_hash(5) == first and len(first) == 70
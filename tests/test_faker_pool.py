@@ -0,0 +1,51 @@
+import json
+import random
+
+import numpy as np
+
+import faker_pool
+
+
+def test_cache_path_is_keyed_by_seed(monkeypatch, tmp_path):
+    pools = faker_pool.FakerPools(size=10, directory=str(tmp_path))
+    path = pools._cache_path("first_name", {})
+    assert pools._cache_path("first_name", {}) == path
+    assert pools._cache_path("first_name", {"x": 1}) != path
+    monkeypatch.setattr(faker_pool, "SEED", 7)
+    assert pools._cache_path("first_name", {}) != path
+
+
+def test_pools_are_generated_once_and_cached(tmp_path):
+    pools = faker_pool.FakerPools(size=20, directory=str(tmp_path))
+    pool = pools.get("first_name")
+    assert len(pool) == 20
+    with open(pools._cache_path("first_name", {}), encoding="utf-8") as f:
+        assert json.load(f) == pool.values.tolist()
+
+    cold = faker_pool.FakerPools(size=20, directory=str(tmp_path / "other"))
+    assert cold.get("first_name").values.tolist() == pool.values.tolist()
+
+
+def test_cached_json_only_generates_on_a_miss(tmp_path):
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return [1, 2, 3]
+
+    path = str(tmp_path / "nested" / "values.json")
+    assert faker_pool.cached_json(path, generate) == [1, 2, 3]
+    assert faker_pool.cached_json(path, generate) == [1, 2, 3]
+    assert len(calls) == 1
+    assert [p.name for p in (tmp_path / "nested").iterdir()] == ["values.json"]
+
+
+def test_draws_follow_the_seeded_streams():
+    pool = faker_pool.ValuePool(["a", "b", "c", "d"])
+    random.seed(1)
+    first = [pool.draw() for _ in range(10)]
+    random.seed(1)
+    assert [pool.draw() for _ in range(10)] == first
+    sample = pool.sample(50, np.random.default_rng(2))
+    assert len(sample) == 50 and set(sample) <= {"a", "b", "c", "d"}
+    assert (sample == pool.sample(50, np.random.default_rng(2))).all()
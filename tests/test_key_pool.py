@@ -0,0 +1,61 @@
+import random
+from collections import Counter
+
+import pytest
+
+import models
+from key_pool import KeyPool, key_pools
+
+
+def make_pool(keys):
+    pool = KeyPool(models.BusinessType)
+    for key in keys:
+        pool.add(key)
+    return pool
+
+
+def test_add_and_discard_keep_the_index_in_step():
+    pool = make_pool(range(1, 6))
+    assert not pool.add(3)
+    assert pool.discard(2)
+    assert not pool.discard(2)
+    assert sorted(pool.keys) == [1, 3, 4, 5]
+    assert all(pool.keys[pool.position(key)] == key for key in pool.keys)
+
+
+def test_sample_skips_excluded_keys():
+    pool = make_pool(range(1, 4))
+    random.seed(1)
+    assert {pool.sample(exclude={1, 2}) for _ in range(50)} == {3}
+    assert pool.sample(exclude={1, 2, 3}) is None
+    assert KeyPool(models.BusinessType).sample() is None
+
+
+def test_weighted_draws_follow_the_alias_table():
+    pool = make_pool(range(1, 5))
+    weights = {1: 1.0, 2: 2.0, 3: 3.0, 4: 4.0}
+    pool.set_weights(weights.get)
+
+    random.seed(4)
+    counts = Counter(pool.sample() for _ in range(20000))
+    for key, weight in weights.items():
+        assert counts[key] / 20000 == pytest.approx(weight / 10, abs=0.02)
+    assert 4 not in Counter(pool.sample(exclude={4}) for _ in range(2000))
+
+    pool.set_weights(None)
+    counts = Counter(pool.sample() for _ in range(20000))
+    assert all(count / 20000 == pytest.approx(0.25, abs=0.02) for count in counts.values())
+
+
+def test_registry_pools_flushed_keys(session):
+    session.add_all([models.BusinessType(name=f"type {i}") for i in range(3)])
+    session.commit()
+    pool = key_pools.pool(models.BusinessType)
+    assert len(pool) == 3
+
+    added = models.BusinessType(name="added")
+    session.add(added)
+    session.flush()
+    assert added.id in pool
+    session.rollback()
+    assert added.id not in pool
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, select
+
+import writers
+
+
+def test_tsv_field_escapes_load_data_specials():
+    assert writers.tsv_field(None) == b"\\N"
+    assert writers.tsv_field(True) == b"1"
+    assert writers.tsv_field("a\tb\nc\\d\0") == b"a\\tb\\nc\\\\d\\0"
+    assert writers.tsv_field(b"\x01\t") == b"\x01\\t"
+    assert writers.tsv_field(datetime(2026, 1, 2, 3, 4)) == b"2026-01-02 03:04:00"
+
+
+def test_load_writer_falls_back_to_multi_row_inserts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'load.db'}")
+    table = Table(
+        "items",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("name", String(20)),
+    )
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql)
+    )
+
+    writer = writers.LoadDataWriter(engine, max_parameters=10)
+    assert not writer.use_load_data
+    writer.open([table])
+    statements.clear()
+    writer.write(table, [{"id": i, "name": f"item {i}"} for i in range(1, 13)])
+    writer.close()
+
+    inserts = [sql for sql in statements if sql.startswith("INSERT")]
+    assert len(inserts) == 3  # 12 rows at 5 rows (10 parameters) per statement
+    with engine.connect() as connection:
+        assert connection.execute(select(table.c.id)).scalars().all() == list(range(1, 13))
+    engine.dispose()
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import event
+
+import models
+import scheduler
+import seed
+from database import engine
+from lookup_cache import LookupCache
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_get_loads_the_table_once_and_raises_on_misses(session, statements):
+    session.add_all([models.BusinessPhase(name="Growth"), models.BusinessPhase(name="Mature")])
+    session.commit()
+    cache = LookupCache()
+    cache.bind(session)
+    statements.clear()
+
+    assert cache.get(models.BusinessPhase, "Growth").name == "Growth"
+    for _ in range(2):
+        with pytest.raises(LookupError, match="No BusinessPhase named 'Decline'"):
+            cache.get(models.BusinessPhase, "Decline")
+    assert cache.get(models.BusinessPhase, "Mature").name == "Mature"
+    assert len(statements) == 1
+
+    session.add(models.BusinessPhase(name="Decline"))
+    session.commit()
+    cache.invalidate(models.BusinessPhase)
+    assert cache.get(models.BusinessPhase, "Decline").name == "Decline"
+
+
+def test_every_lookup_table_gets_a_row_at_size_one():
+    counts = {
+        factory_class._meta.model: num for _, factory_class, num in seed.independent_tasks(1)
+    }
+    assert all(counts[model] >= 1 for model in seed.LOOKUP_MODELS)
+
+
+def test_seeding_completes_at_size_one(session):
+    scheduler.run_serially(seed.seeding_tasks(1), session)
+    assert session.query(models.User).count() == 1
+    assert session.query(models.Business).count() == 1
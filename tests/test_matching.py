@@ -0,0 +1,49 @@
+import random
+
+import factories
+import models
+from matching import PartnerMatcher
+
+# (business id, type id, category id)
+ROWS = [
+    (1, 1, 1),
+    (2, 1, 1),
+    (3, 1, 2),
+    (4, 1, 3),
+    (5, 2, 1),
+    (6, 2, 2),
+    (7, None, 1),
+]
+
+
+def test_partners_share_the_type_but_not_the_category():
+    matcher = PartnerMatcher(ROWS)
+    random.seed(1)
+    assert sorted(matcher.sample(1, degree=5)) == [3, 4]
+    assert sorted(matcher.sample(3, degree=5)) == [1, 2, 4]
+    assert matcher.sample(5, degree=5) == [6]
+    assert matcher.sample(7) == []
+    assert matcher.business_ids == [1, 2, 3, 4, 5, 6]
+
+
+def test_sample_returns_distinct_partners_up_to_degree():
+    matcher = PartnerMatcher(ROWS)
+    random.seed(2)
+    for _ in range(20):
+        partners = matcher.sample(3, degree=2)
+        assert len(partners) == len(set(partners)) == 2
+        assert set(partners) <= {1, 2, 4}
+
+
+def test_connection_factory_draws_complementary_partners(session):
+    session.add_all(models.BusinessType(id=i) for i in (1, 2))
+    session.add_all(models.BusinessCategory(id=i) for i in (1, 2, 3))
+    session.add_all(
+        models.Business(id=business, business_type_id=type_id, business_category_id=category)
+        for business, type_id, category in ROWS
+    )
+    session.commit()
+    random.seed(3)
+    for _ in range(20):
+        connection = factories.BusinessConnectionFactory.build(initiating_business_id=1)
+        assert connection.receiving_business_id in (3, 4)
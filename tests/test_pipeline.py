@@ -0,0 +1,19 @@
+import models
+import pipeline
+
+
+def test_iter_chunks_covers_the_range_once():
+    assert list(pipeline.iter_chunks(10, 4, offset=5)) == [(5, 4), (9, 4), (13, 2)]
+    assert list(pipeline.iter_chunks(0, 4)) == []
+
+
+def test_stream_user_entities_commits_every_chunk(lookup_tables):
+    session = lookup_tables
+    rates = pipeline.stream_user_entities(session, 7, 3, offset=2)
+
+    assert len(rates) == 3
+    assert not session.identity_map
+    ids = [user_id for (user_id,) in session.query(models.User.id).order_by(models.User.id)]
+    assert ids == list(range(3, 10))
+    for model in (models.Business, models.UserLogin, models.Idea, models.UserPost):
+        assert session.query(model).count() == 7
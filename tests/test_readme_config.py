@@ -0,0 +1,29 @@
+import os
+import re
+import tomllib
+
+from conftest import ROOT
+
+
+def read(name):
+    with open(os.path.join(ROOT, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def nested_keys(table):
+    for key, value in table.items():
+        if isinstance(value, dict):
+            yield from nested_keys(value)
+        else:
+            yield key
+
+
+def test_readme_sample_keeps_top_level_settings_out_of_tables():
+    sample = re.search(r"```toml\n(.*?)```", read("README.md"), re.S).group(1)
+    settings = tomllib.loads(sample)
+    top_level = set(re.findall(r'^\w+ = config\.get\("(\w+)"', read("config.py"), re.M))
+
+    tables = {key: value for key, value in settings.items() if isinstance(value, dict)}
+    assert set(tables) == {"engine", "scale"}
+    assert not top_level & set(nested_keys(tables))
+    assert {"reference_date", "output", "faker_pools", "snapshot"} <= settings.keys()
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from sampling import DENSE_FRACTION, _floyd, sample_unique_pairs, sample_without_replacement
+
+
+def test_floyd_draws_distinct_values_in_range():
+    values = _floyd(1000, 100, np.random.default_rng(1))
+    assert len(set(values.tolist())) == 100
+    assert values.min() >= 0 and values.max() < 1000
+
+
+@pytest.mark.parametrize("num", [10, int(200 * DENSE_FRACTION) + 1, 200])
+def test_sample_without_replacement_sparse_and_dense(num):
+    values = sample_without_replacement(200, num, np.random.default_rng(2)).tolist()
+    assert len(values) == len(set(values)) == num
+    assert all(0 <= value < 200 for value in values)
+
+
+@pytest.mark.parametrize("num", [5, 80, 500])
+def test_sample_without_replacement_skips_excluded(num):
+    excluded = list(range(0, 200, 3)) + [199]
+    values = sample_without_replacement(200, num, np.random.default_rng(3), exclude=excluded)
+    free = 200 - len(set(excluded))
+    assert len(values) == min(num, free)
+    assert len(set(values.tolist())) == len(values)
+    assert not set(values.tolist()) & set(excluded)
+    assert values.max() < 200
+
+
+def test_sample_unique_pairs_caps_at_grid_size():
+    left, right = sample_unique_pairs(3, 4, 50, np.random.default_rng(4))
+    assert sorted(zip(left.tolist(), right.tolist())) == [
+        (i, j) for i in range(3) for j in range(4)
+    ]
@@ -0,0 +1,51 @@
+import factory
+from factory.alchemy import SQLAlchemyModelFactory
+
+import models
+import seed
+from key_pool import key_pools
+
+
+class DuplicateSkillFactory(SQLAlchemyModelFactory):
+    """Repeats names so every other flush hits the unique constraint."""
+
+    class Meta:
+        model = models.BusinessSkill
+        sqlalchemy_session_persistence = "flush"
+
+    name = factory.Iterator(["Sales", "Sales", "Marketing", "Marketing", "Finance"])
+
+
+def test_duplicates_roll_back_only_their_own_row(session, capsys):
+    DuplicateSkillFactory._meta.sqlalchemy_session = session
+    DuplicateSkillFactory.reset_sequence()
+
+    created = seed.safe_create_batch(DuplicateSkillFactory, 4, session)
+    session.commit()
+
+    assert created == 3
+    names = sorted(name for (name,) in session.query(models.BusinessSkill.name))
+    assert names == ["Finance", "Marketing", "Sales"]
+    assert "Could only create 3/4 unique BusinessSkill" in capsys.readouterr().out
+
+
+def test_savepoint_rollback_reverts_only_its_own_keys(session):
+    session.add(models.BusinessSkill(name="kept"))
+    session.commit()
+    pool = key_pools.pool(models.BusinessSkill)
+
+    before = models.BusinessSkill(name="before")
+    session.add(before)
+    session.flush()
+
+    inner = session.begin_nested()
+    dropped = models.BusinessSkill(name="dropped")
+    session.add(dropped)
+    session.flush()
+    assert dropped.id in pool
+    inner.rollback()
+
+    assert dropped.id not in pool
+    assert before.id in pool
+    session.commit()
+    assert len(pool) == 2
@@ -0,0 +1,90 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import bulk
+import models
+import scale
+import seed
+from key_pool import key_pools
+
+ZIPF = {"distribution": "zipf", "a": 3.0}
+
+
+@pytest.fixture
+def profile(monkeypatch):
+    """Installs a [scale] profile for the duration of a test."""
+
+    def install(tables=None, degrees=None):
+        monkeypatch.setitem(scale.SCALE, "tables", tables or {})
+        monkeypatch.setitem(scale.SCALE, "degrees", degrees or {})
+
+    return install
+
+
+def test_table_count_reads_counts_and_ratios(profile):
+    profile(tables={"ideas": 7, "idea_votes": 2.5})
+    assert scale.table_count("ideas", 3, 10) == 7
+    assert scale.table_count("idea_votes", 3, 10) == 25
+    assert scale.table_count("projects", 3, 10) == 3
+
+
+def test_key_weights(profile):
+    uniform = {"distribution": "uniform"}
+    profile(degrees={"idea_votes": {"voter_user_id": ZIPF, "idea_id": uniform}})
+    assert scale.degree_spec("idea_votes", "idea_id") is None
+    spec = scale.degree_spec("idea_votes", "voter_user_id")
+
+    weights = scale.key_weights(spec, 10, np.random.default_rng(1))
+    assert weights.sum() == pytest.approx(1.0)
+    assert sorted(weights)[-1] == pytest.approx(1 / sum(r**-3.0 for r in range(1, 11)))
+    assert scale.key_weights(None, 10, np.random.default_rng(1)) is None
+    with pytest.raises(ValueError, match="Unknown distribution"):
+        scale.key_weights({"distribution": "pareto"}, 10, np.random.default_rng(1))
+
+
+def test_sample_weighted_pairs_are_distinct_and_skip_excluded():
+    rng = np.random.default_rng(2)
+    hub = np.array([0.9, 0.05, 0.05])
+    left, right = scale.sample_weighted_pairs(hub, None, 3, 4, 8, rng, exclude=([0], [0]))
+    pairs = list(zip(left.tolist(), right.tolist()))
+    assert len(pairs) == len(set(pairs)) == 8
+    assert (0, 0) not in pairs
+
+    left, right = scale.sample_weighted_pairs(None, None, 2, 2, 10, rng)
+    assert len(left) == 4
+
+
+def test_connection_degrees_keep_the_mean(profile):
+    ids = list(range(20))
+    profile()
+    assert scale.connection_degrees(ids, 3, np.random.default_rng(3)) == [3] * 20
+
+    profile(degrees={"business_connections": {"initiating_business_id": ZIPF}})
+    degrees = scale.connection_degrees(ids, 3, np.random.default_rng(3))
+    assert sum(degrees) == 60
+    assert max(degrees) > 3 * 3
+
+
+def test_skewed_foreign_keys_weights_parent_pools_while_seeding(session, profile):
+    session.add_all([models.User(id=i, first_name=f"user {i}") for i in range(1, 11)])
+    session.commit()
+    profile(degrees={"idea_votes": {"voter_user_id": ZIPF}})
+    pool = key_pools.pool(models.User)
+    random.seed(5)
+
+    with bulk.skewed_foreign_keys(models.IdeaVote, np.random.default_rng(4)):
+        skewed = Counter(pool.sample() for _ in range(2000))
+    uniform = Counter(pool.sample() for _ in range(2000))
+
+    assert max(skewed.values()) > 0.6 * 2000
+    assert max(uniform.values()) < 0.2 * 2000
+
+
+def test_connection_shortfall_warning(capsys):
+    seed.warn_connection_shortfall(5, 5)
+    assert capsys.readouterr().out == ""
+    seed.warn_connection_shortfall(3, 5)
+    assert "Could only create 3/5 business connections" in capsys.readouterr().out
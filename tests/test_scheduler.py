@@ -0,0 +1,62 @@
+import factories
+import models
+import scheduler
+from scheduler import SeedTask
+
+
+def noop(session):
+    pass
+
+
+def add_type(session, name):
+    session.add(models.BusinessType(name=name))
+
+
+def build_tasks():
+    return [
+        SeedTask("Users", [models.User], noop),
+        SeedTask("Types", [models.BusinessType], lambda s: add_type(s, "SaaS")),
+        SeedTask("Businesses", [models.Business], noop),
+        SeedTask("Regions", [models.Region], noop),
+        SeedTask("More Types", [models.BusinessType], lambda s: add_type(s, "Retail")),
+        SeedTask("Connections", [models.BusinessConnection], noop),
+    ]
+
+
+def test_factory_models_follow_subfactories():
+    found = scheduler.factory_models(factories.UserLoginFactory)
+    assert found == [models.UserLogin, models.User]
+
+
+def test_tasks_wait_for_parents_and_earlier_writers():
+    dependencies = scheduler.task_dependencies(build_tasks())
+    assert dependencies[0] == set()
+    assert dependencies[1] == set()
+    assert dependencies[2] == {0, 1}
+    assert dependencies[3] == set()
+    assert dependencies[4] == {1}
+    assert dependencies[5] == {0, 1, 2, 4}
+
+
+def test_reads_add_dependencies():
+    tasks = [
+        SeedTask("Enrolments", [models.DailyActivityEnrolment], noop),
+        SeedTask("Progress", [models.Region], noop, reads=[models.DailyActivityEnrolment]),
+    ]
+    assert scheduler.task_dependencies(tasks)[1] == {0}
+
+
+def test_critical_path_is_the_longest_dependent_chain():
+    durations = {0: 1.0, 1: 2.0, 2: 1.0, 3: 5.0, 4: 1.0, 5: 1.0}
+    # Types -> Businesses -> Connections takes 4s, Regions alone 5s.
+    assert scheduler.critical_path(build_tasks(), durations) == 5.0
+    durations[3] = 0.5
+    assert scheduler.critical_path(build_tasks(), durations) == 4.0
+
+
+def test_run_concurrently_runs_every_task(session):
+    session.commit()
+    durations = scheduler.run_concurrently(build_tasks, (), 2)
+    assert sorted(durations) == list(range(6))
+    names = [name for (name,) in session.query(models.BusinessType.name)]
+    assert names == ["SaaS", "Retail"]
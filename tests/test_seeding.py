@@ -0,0 +1,51 @@
+import random
+
+from sqlalchemy import inspect
+
+import factories
+import models
+import pipeline
+from seeding import derive_seed, numpy_rng, reseed
+
+
+def column_values(objects):
+    return [
+        (
+            type(obj).__name__,
+            [getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs],
+        )
+        for obj in objects
+    ]
+
+
+def generate_users(total, chunk_size):
+    rows = []
+    for start, count in pipeline.iter_chunks(total, chunk_size):
+        users, entities = pipeline.generate_user_chunk(start, count)
+        rows += column_values(users + entities)
+    return sorted(rows, key=repr)
+
+
+def test_streams_depend_only_on_their_labels():
+    assert derive_seed("users", 1) == derive_seed("users", 1)
+    assert derive_seed("users", 1) != derive_seed("users", 2)
+    reseed("users", 3)
+    first = random.random()
+    reseed("users", 3)
+    assert random.random() == first
+    assert numpy_rng("links", "x").integers(1 << 30) == numpy_rng("links", "x").integers(1 << 30)
+
+
+def test_user_rows_do_not_depend_on_chunk_size(lookup_tables):
+    rows = generate_users(12, 5)
+    assert len(rows) == 12 * 6
+    assert rows == generate_users(12, 12) == generate_users(12, 1)
+
+
+def test_subscriptions_start_within_the_year_before_the_reference_date(lookup_tables):
+    starts = [
+        factories.UserSubscriptionFactory.build(user=models.User(id=i)).date_from
+        for i in range(50)
+    ]
+    assert all(factories.YEAR_AGO <= start <= factories.NOW for start in starts)
+    assert len(set(starts)) > 1
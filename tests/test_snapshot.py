@@ -0,0 +1,111 @@
+import os
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    create_engine,
+    insert,
+    select,
+)
+
+from snapshot import MANIFEST, SnapshotCache, schema_hash, snapshot_key
+
+
+def make_metadata(extra_column=False):
+    metadata = MetaData()
+    Table("owners", metadata, Column("id", Integer, primary_key=True), Column("name", String(20)))
+    columns = [
+        Column("id", Integer, primary_key=True),
+        Column("owner_id", ForeignKey("owners.id")),
+        Column("price", Numeric(8, 2)),
+        Column("created", DateTime),
+        Column("digest", LargeBinary),
+    ]
+    if extra_column:
+        columns.append(Column("note", String(20)))
+    Table("items", metadata, *columns)
+    return metadata
+
+
+ITEMS = [
+    {
+        "id": 1,
+        "owner_id": 1,
+        "price": Decimal("9.50"),
+        "created": datetime(2026, 1, 2, 3, 4),
+        "digest": b"\x00\xff",
+    },
+    {"id": 2, "owner_id": 2, "price": None, "created": None, "digest": None},
+]
+
+
+def seeded_engine(tmp_path, metadata):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        owners = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+        connection.execute(insert(metadata.tables["owners"]), owners)
+        connection.execute(insert(metadata.tables["items"]), ITEMS)
+    return engine
+
+
+def dump(engine, metadata):
+    with engine.connect() as connection:
+        return {
+            table.name: [dict(row) for row in connection.execute(select(table)).mappings()]
+            for table in metadata.sorted_tables
+        }
+
+
+def test_save_and_restore_round_trip(tmp_path):
+    metadata = make_metadata()
+    engine = seeded_engine(tmp_path, metadata)
+    cache = SnapshotCache(metadata, str(tmp_path / "snapshots"))
+    cache.save(engine, "key", batch_size=1)
+    assert cache.manifest("key")["tables"] == {"owners": 2, "items": 2}
+    assert os.listdir(tmp_path / "snapshots") == ["key"]
+
+    before = dump(engine, metadata)
+    metadata.drop_all(engine)
+    assert cache.restore(engine, "key", batch_size=1)
+    assert dump(engine, metadata) == before
+    assert before["items"] == ITEMS
+
+
+def test_restore_ignores_missing_and_stale_snapshots(tmp_path):
+    metadata = make_metadata()
+    engine = seeded_engine(tmp_path, metadata)
+    cache = SnapshotCache(metadata, str(tmp_path / "snapshots"))
+    assert not cache.restore(engine, "key")
+
+    cache.save(engine, "key")
+    changed = make_metadata(extra_column=True)
+    assert schema_hash(changed) != schema_hash(metadata)
+    assert not SnapshotCache(changed, cache.directory).restore(engine, "key")
+
+    os.remove(os.path.join(cache.path("key"), "items.jsonl.gz"))
+    assert not cache.restore(engine, "key")
+    with open(os.path.join(cache.path("key"), MANIFEST), "w", encoding="utf-8") as handle:
+        handle.write("{")
+    assert cache.manifest("key") is None
+    assert dump(engine, metadata)["items"] == ITEMS
+
+
+def test_snapshot_key_tracks_data_settings_only():
+    metadata = make_metadata()
+    settings = {"seed": 1, "data_generation_size": 10, "reference_date": "2026-01-01", "workers": 1}
+    key = snapshot_key(metadata, settings)
+
+    assert snapshot_key(metadata, dict(settings, workers=8, output="csv")) == key
+    assert snapshot_key(metadata, dict(settings, seed=2)) != key
+    assert snapshot_key(metadata, dict(settings, data_generation_size=11)) != key
+    assert snapshot_key(make_metadata(extra_column=True), settings) != key
@@ -0,0 +1,80 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pytz
+from sqlalchemy import inspect
+
+import models
+import pipeline
+from database import Base
+from staging import ColumnStore, StagingStore
+
+
+def test_column_store_grows_and_keeps_nulls():
+    store = ColumnStore(models.UserSubscription.__table__, capacity=2)
+    when = datetime(2026, 1, 2, 3, 4, 5, tzinfo=pytz.utc)
+    store.append({"user_id": 1, "subscription_id": 2, "date_from": when})
+    store.append({"user_id": 2, "subscription_id": None})
+    store.extend({"user_id": np.arange(3, 6), "subscription_id": np.full(3, 7)})
+
+    assert len(store) == 5
+    names, rows = store.to_tuples()
+    assert names == ["user_id", "subscription_id", "date_from"]
+    assert rows[0] == (1, 2, datetime(2026, 1, 2, 3, 4, 5))
+    assert rows[1] == (2, None, None)
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+    assert type(rows[2][0]) is int
+
+    store.clear()
+    assert len(store) == 0 and store.to_rows() == []
+
+
+def normalized(value):
+    # Staging keeps Numeric as float64 and timestamps without a time zone.
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def test_staged_rows_match_the_orm_build(lookup_tables):
+    store = pipeline.stage_user_chunk(StagingStore(Base.metadata), 0, 6)
+    staged = {}
+    for table, names, rows in store.drain():
+        staged[table] = sorted(
+            sorted((name, normalized(value)) for name, value in zip(names, row)) for row in rows
+        )
+    assert len(store) == 0
+
+    # Flushing fills in the foreign keys that the ORM build only holds as relationships.
+    users, entities = pipeline.generate_user_chunk(0, 6)
+    lookup_tables.add_all(users + entities)
+    lookup_tables.flush()
+    built = {}
+    for obj in users + entities:
+        table = obj.__table__.name
+        names = {name for name, _ in staged[table][0]}
+        built.setdefault(table, []).append(
+            sorted(
+                (attr.columns[0].name, normalized(getattr(obj, attr.key)))
+                for attr in inspect(obj).mapper.column_attrs
+                if attr.columns[0].name in names
+            )
+        )
+    assert staged == {table: sorted(rows) for table, rows in built.items()}
+
+
+def test_flush_to_inserts_in_foreign_key_order(lookup_tables):
+    session = lookup_tables
+    store = pipeline.stage_user_chunk(StagingStore(Base.metadata), 0, 4)
+    assert len(store) == 4 * 6
+    store.flush_to(session.connection())
+    session.commit()
+
+    assert session.query(models.User).count() == 4
+    assert session.query(models.UserLogin).count() == 4
+    assert len(store) == 0
@@ -0,0 +1,40 @@
+import os
+from datetime import date
+
+import numpy as np
+
+import timeseries
+from conftest import WORKDIR
+
+
+def concatenated(blocks):
+    blocks = list(blocks)
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def test_progress_blocks_are_reproducible_and_bounded(monkeypatch):
+    monkeypatch.setattr(timeseries, "BLOCK_SIZE", 4)
+    pairs = [(activity, user) for activity in (1, 2) for user in range(1, 6)]
+    blocks = list(timeseries.iter_progress_blocks(pairs, 30, date(2026, 1, 1), 0.5))
+
+    assert len(blocks) == timeseries.block_count(len(pairs)) == 3
+    rows = concatenated(blocks)
+    shuffled = concatenated(timeseries.iter_progress_blocks(pairs[::-1], 30, date(2026, 1, 1), 0.5))
+    assert all(np.array_equal(rows[name], shuffled[name]) for name in rows)
+    assert rows["progress"].min() >= 1 and rows["progress"].max() <= 100
+    assert rows["date"].min() >= np.datetime64("2025-12-03")
+    assert rows["date"].max() <= np.datetime64("2026-01-01")
+
+
+def test_notification_blocks_without_faker_pools():
+    users = np.arange(1, 11)
+    end = date(2026, 1, 1)
+    blocks = list(timeseries.iter_notification_blocks(users, 200, 7, end, None, 101))
+    rows = concatenated(blocks)
+
+    assert list(rows["id"]) == list(range(101, 301))
+    assert not (rows["sender_user_id"] == rows["receiver_user_id"]).any()
+    assert all(isinstance(message, str) and message for message in rows["message"])
+    again = concatenated(timeseries.iter_notification_blocks(users, 200, 7, end, None, 101))
+    assert list(again["message"]) == list(rows["message"])
+    assert not os.path.exists(os.path.join(WORKDIR, "faker_pools"))
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    event,
+    func,
+    select,
+)
+
+import models
+import parallel
+import pipeline
+from database import Base
+from write_queue import WriteQueues
+
+METADATA = MetaData()
+PARENTS = Table("parents", METADATA, Column("id", Integer, primary_key=True))
+CHILDREN = Table(
+    "children",
+    METADATA,
+    Column("id", Integer, primary_key=True),
+    Column("parent_id", ForeignKey("parents.id"), nullable=False),
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A file database that enforces foreign keys, so out-of-order batches fail."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'queues.db'}")
+    event.listen(
+        engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON")
+    )
+    METADATA.create_all(engine)
+    return engine
+
+
+def chunk(first, count):
+    ids = [(i,) for i in range(first, first + count)]
+    return [("parents", ["id"], ids), ("children", ["id", "parent_id"], [i * 2 for i in ids])]
+
+
+def count(engine, table):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(table)).scalar()
+
+
+def test_children_wait_for_their_chunk_of_parents(engine):
+    queues = WriteQueues(engine, METADATA, maxsize=1)
+    for number in range(20):
+        queues.put_chunk(chunk(number * 10 + 1, 10))
+    queues.close()
+
+    assert count(engine, PARENTS) == count(engine, CHILDREN) == 200
+    metrics = {table.name: writer.metrics for table, writer in queues.writers.items()}
+    assert metrics["children"].batches == metrics["children"].rows / 10 == 20
+    assert metrics["parents"].max_depth <= 1
+
+
+def test_errors_are_raised_on_close_without_blocking_producers(engine):
+    queues = WriteQueues(engine, METADATA, maxsize=1)
+    queues.put_chunk(chunk(1, 5))
+    for _ in range(5):
+        queues.put_chunk(chunk(1, 5))
+    with pytest.raises(Exception, match="UNIQUE"):
+        queues.close()
+    assert count(engine, PARENTS) == 5
+
+
+USER_MODELS = (models.User, models.Business, models.UserLogin, models.Idea, models.UserPost)
+
+
+def user_rows(session):
+    return {
+        model.__tablename__: sorted(map(tuple, session.execute(select(model.__table__))))
+        for model in USER_MODELS
+    }
+
+
+def test_pipelined_users_match_the_serial_pipeline(lookup_tables):
+    session = lookup_tables
+    parallel.seed_users_pipelined(9, 4, workers=2, queue_size=2)
+    pipelined = user_rows(session)
+    session.commit()
+
+    for table in reversed(Base.metadata.sorted_tables):
+        if table in {model.__table__ for model in USER_MODELS + (models.UserSubscription,)}:
+            session.execute(table.delete())
+    session.commit()
+    pipeline.stream_user_entities(session, 9, 4)
+
+    assert len(pipelined["users"]) == 9
+    assert user_rows(session) == pipelined
@@ -0,0 +1,98 @@
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+import pytz
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    LargeBinary,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+)
+
+import models
+import writers
+from database import Base
+from export import export_dataset
+
+TABLE = Table(
+    "samples",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("name", String(20)),
+    Column("active", Boolean),
+    Column("price", Numeric(10, 2)),
+    Column("created", DateTime),
+    Column("digest", LargeBinary),
+)
+
+ROWS = [
+    {
+        "id": 1,
+        "name": "a, \"quoted\"",
+        "active": True,
+        "price": Decimal("9.50"),
+        "created": pytz.utc.localize(datetime(2026, 1, 2, 3, 4, 5)),
+        "digest": b"\x00\xff",
+    },
+    {"id": 2, "name": None, "active": False, "price": None, "created": None, "digest": None},
+]
+
+
+def write(writer):
+    writer.open([TABLE])
+    writer.write(TABLE, ROWS)
+    writer.close()
+    return writer.path(TABLE)
+
+
+def test_csv_writer(tmp_path):
+    with open(write(writers.CsvWriter(str(tmp_path))), newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        ["id", "name", "active", "price", "created", "digest"],
+        ["1", "a, \"quoted\"", "1", "9.50", "2026-01-02 03:04:05", "00ff"],
+        ["2", "", "0", "", "", ""],
+    ]
+
+
+def test_json_lines_writer(tmp_path):
+    with open(write(writers.JsonLinesWriter(str(tmp_path))), encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[0] == {
+        "id": 1,
+        "name": "a, \"quoted\"",
+        "active": True,
+        "price": "9.50",
+        "created": "2026-01-02T03:04:05",
+        "digest": "00ff",
+    }
+    assert records[1]["name"] is None
+
+
+def test_parquet_writer(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(write(writers.ParquetWriter(str(tmp_path))))
+    assert table.column("price").to_pylist() == [Decimal("9.50"), None]
+    assert table.column("digest").to_pylist() == [b"\x00\xff", None]
+    assert table.column("created").to_pylist()[0] == datetime(2026, 1, 2, 3, 4, 5)
+
+
+def test_create_writer_rejects_unknown_outputs():
+    with pytest.raises(ValueError, match="Unknown output 'xml'"):
+        writers.create_writer("xml", "out")
+
+
+def test_export_writes_every_table_without_a_database(tmp_path):
+    export_dataset(writers.JsonLinesWriter(str(tmp_path)), size=5, chunk_size=2)
+    for table in Base.metadata.sorted_tables:
+        assert (tmp_path / f"{table.name}.jsonl").exists()
+    with open(tmp_path / f"{models.User.__tablename__}.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == [1, 2, 3, 4, 5]
@@ -0,0 +1,122 @@
+import numpy as np
+
+from faker_pool import faker_sample
+from seeding import numpy_rng
+
+
+# Pairs or senders per generated block. Each block has its own seed stream,
+# so this is fixed rather than tied to chunk_size, which would change the data.
+BLOCK_SIZE = 1024
+
+# Relative chance of a notification being sent in each local hour of the day.
+HOURLY_WEIGHTS = np.array(
+    [1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 14, 13, 12, 13, 14, 14, 13, 12, 10, 9, 8, 6, 4, 2],
+    dtype=np.float64,
+)
+HOURLY_WEIGHTS /= HOURLY_WEIGHTS.sum()
+
+
+def date_range(days, end):
+    """The `days` calendar dates up to and including `end`, as datetime64[D]."""
+    last = np.datetime64(end, "D")
+    return np.arange(last - (days - 1), last + 1, dtype="datetime64[D]")
+
+
+def block_count(items):
+    """Number of blocks the iter_*_blocks generators yield for `items` pairs or senders."""
+    return -(-items // BLOCK_SIZE)
+
+
+def progress_block(activity_ids, user_ids, dates, rate, rng):
+    """Daily progress rows for enrolment pairs over `dates`, as {column: array}.
+
+    Each pair is active on a day with probability `rate` and gains 1-15
+    points per active day, so progress climbs towards 100 over the range.
+    """
+    active = rng.random((len(user_ids), len(dates))) < rate
+    gains = rng.integers(1, 16, active.shape) * active
+    progress = np.minimum(np.cumsum(gains, axis=1), 100)
+    pair, day = np.nonzero(active)
+    return {
+        "date": dates[day],
+        "user_id": user_ids[pair],
+        "daily_activity_id": activity_ids[pair],
+        "progress": progress[pair, day],
+    }
+
+
+def iter_progress_blocks(pairs, days, end, rate, labels=("progress",)):
+    """Yields progress_block columns for (daily_activity_id, user_id) pairs, block by block.
+
+    Pairs are sorted and every block of BLOCK_SIZE pairs has its own seed
+    stream, so the rows depend on neither query order nor chunk_size.
+    """
+    block_size = BLOCK_SIZE
+    pairs = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+    dates = date_range(days, end)
+    for number, start in enumerate(range(0, len(pairs), block_size)):
+        block = pairs[start : start + block_size]
+        rng = numpy_rng(*labels, number)
+        yield progress_block(block[:, 0], block[:, 1], dates, rate, rng)
+
+
+def notification_block(first_id, sender_ids, counts, user_ids, days, end, rng):
+    """Notification streams for a block of senders, as {column: array}.
+
+    Sender `sender_ids[i]` sends `counts[i]` notifications to random other
+    users. Send times fall on a random day of the range at an hour drawn
+    from HOURLY_WEIGHTS, each stream is in time order, and older messages
+    are more likely to have been opened.
+    """
+    total = int(counts.sum())
+    senders = np.repeat(sender_ids, counts)
+    receivers = user_ids[rng.integers(0, len(user_ids), total)]
+    # Redraw self-addressed messages once; a single user can only message itself.
+    clash = receivers == senders
+    receivers[clash] = user_ids[rng.integers(0, len(user_ids), int(clash.sum()))]
+
+    day = rng.integers(0, days, total)
+    seconds = rng.choice(24, total, p=HOURLY_WEIGHTS) * 3600 + rng.integers(0, 3600, total)
+    first_day = np.datetime64(end, "D") - (days - 1)
+    time_sent = (first_day + day).astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+
+    order = np.lexsort((time_sent, senders))
+    age = 1.0 - day[order] / max(days - 1, 1)
+    return {
+        "id": np.arange(first_id, first_id + total, dtype=np.int64),
+        "sender_user_id": senders[order],
+        "receiver_user_id": receivers[order],
+        "message": faker_sample("sentence", total, rng),
+        "time_sent": time_sent[order],
+        "opened": rng.random(total) < 0.3 + 0.6 * age,
+    }
+
+
+def iter_notification_blocks(
+    user_ids, total, days, end, weights, first_id, labels=("notifications",)
+):
+    """Yields notification_block columns for `total` notifications over all users.
+
+    The total is split over senders by `weights` (None for uniform) with one
+    multinomial draw, then generated in blocks of BLOCK_SIZE senders.
+    """
+    block_size = BLOCK_SIZE
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    if total <= 0 or len(user_ids) == 0:
+        return
+    rng = numpy_rng(*labels, "counts")
+    if weights is None:
+        weights = np.full(len(user_ids), 1 / len(user_ids))
+    counts = rng.multinomial(total, weights)
+    next_id = first_id
+    for number, start in enumerate(range(0, len(user_ids), block_size)):
+        block_counts = counts[start : start + block_size]
+        if not block_counts.sum():
+            continue
+        rng = numpy_rng(*labels, number)
+        senders = user_ids[start : start + block_size]
+        columns = notification_block(
+            next_id, senders, block_counts, user_ids, days, end, rng
+        )
+        next_id += int(block_counts.sum())
+        yield columns
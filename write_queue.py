@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+
+from sqlalchemy import insert
+
+
+class QueueMetrics:
+    """Depth and wait-time counters for one bounded queue."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.batches = 0
+        self.rows = 0
+        self.depth_total = 0
+        self.max_depth = 0
+        self.put_wait = 0.0
+        self.get_wait = 0.0
+
+    def record_put(self, depth, waited):
+        self.batches += 1
+        self.depth_total += depth
+        self.max_depth = max(self.max_depth, depth)
+        self.put_wait += waited
+
+    @property
+    def mean_depth(self):
+        return self.depth_total / self.batches if self.batches else 0.0
+
+
+class TableWriterThread(threading.Thread):
+    """Bulk-inserts one table's batches from a bounded queue over one pooled connection.
+
+    Each batch is (column names, row tuples, events to wait for, done
+    event); it is inserted with one executemany after the events are set.
+    After an error the thread keeps draining the queue without inserting,
+    so producers never block, and close() re-raises the error.
+    """
+
+    def __init__(self, engine, table, maxsize):
+        super().__init__(name=f"writer-{table.name}", daemon=True)
+        self.engine = engine
+        self.table = table
+        self.queue = queue.Queue(maxsize)
+        self.metrics = QueueMetrics(maxsize)
+        self.error = None
+
+    def put(self, batch):
+        depth = self.queue.qsize()
+        started = time.perf_counter()
+        self.queue.put(batch)
+        self.metrics.record_put(depth, time.perf_counter() - started)
+
+    def run(self):
+        with self.engine.connect() as connection:
+            while True:
+                started = time.perf_counter()
+                batch = self.queue.get()
+                self.metrics.get_wait += time.perf_counter() - started
+                if batch is None:
+                    return
+                names, rows, waits, done = batch
+                try:
+                    for event in waits:
+                        event.wait()
+                    if self.error is None:
+                        with connection.begin():
+                            connection.execute(
+                                insert(self.table), [dict(zip(names, row)) for row in rows]
+                            )
+                        self.metrics.rows += len(rows)
+                except Exception as error:
+                    self.error = error
+                finally:
+                    done.set()
+
+
+class WriteQueues:
+    """A writer thread and bounded queue per table, fed chunk by chunk.
+
+    A chunk's batch for a table waits until the same chunk's batches for
+    the tables it references are inserted, so foreign keys hold while
+    every table is written concurrently.
+    """
+
+    def __init__(self, engine, metadata, maxsize=4):
+        self.engine = engine
+        self.metadata = metadata
+        self.maxsize = maxsize
+        self.writers = {}
+        self.started = time.perf_counter()
+
+    def _writer(self, table):
+        writer = self.writers.get(table)
+        if writer is None:
+            writer = self.writers[table] = TableWriterThread(self.engine, table, self.maxsize)
+            writer.start()
+        return writer
+
+    def put_chunk(self, chunk):
+        """Queues [(table name, column names, row tuples)], blocking while a queue is full."""
+        done = {}
+        for table_name, names, rows in chunk:
+            table = self.metadata.tables[table_name]
+            waits = [
+                done[fk.column.table]
+                for fk in table.foreign_keys
+                if fk.column.table is not table and fk.column.table in done
+            ]
+            done[table] = threading.Event()
+            self._writer(table).put((names, rows, waits, done[table]))
+
+    def close(self):
+        """Waits for every queued batch to be inserted and re-raises the first error."""
+        for writer in self.writers.values():
+            writer.queue.put(None)
+        for writer in self.writers.values():
+            writer.join()
+        for writer in self.writers.values():
+            if writer.error is not None:
+                raise writer.error
+
+    def report(self):
+        """Prints queue depths and waits, and whether generation or the database is slower.
+
+        Full queues stall the producer (database-bound); empty queues leave
+        the writer threads idle (generation-bound).
+        """
+        elapsed = time.perf_counter() - self.started
+        print(
+            f"\n{'table':<24} {'batches':>8} {'rows':>9} {'mean depth':>11} {'max':>5} "
+            f"{'put wait s':>11} {'idle %':>7}"
+        )
+        put_wait = idle = 0.0
+        for table, writer in self.writers.items():
+            m = writer.metrics
+            idle_share = m.get_wait / elapsed if elapsed else 0.0
+            put_wait += m.put_wait
+            idle += idle_share
+            print(
+                f"{table.name:<24} {m.batches:>8} {m.rows:>9} "
+                f"{m.mean_depth:>6.1f}/{m.maxsize:<4} {m.max_depth:>5} "
+                f"{m.put_wait:>11.2f} {idle_share:>7.0%}"
+            )
+        if self.writers:
+            idle /= len(self.writers)
+            bottleneck = "the database" if put_wait > idle * elapsed else "generation"
+            print(
+                f"Generation waited {put_wait:.2f}s on full queues; writers were idle "
+                f"{idle:.0%} of {elapsed:.2f}s. Bottleneck: {bottleneck}."
+            )
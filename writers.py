@@ -0,0 +1,357 @@
+import csv
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert, types
+
+import constraints
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional.
+    pa = None
+    pq = None
+
+
+BINARY_TYPES = (types.LargeBinary, types.BINARY, types.VARBINARY)
+
+
+def plain_value(value):
+    """Normalizes a column value for file output: naive datetimes, hex bytes."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+class TableWriter:
+    """Receives batches of generated rows, one table at a time.
+
+    Rows are dicts keyed by column name. Batches for a table arrive in
+    generation order, and parent tables are always written before the
+    tables that reference them.
+    """
+
+    def open(self, tables):
+        pass
+
+    def write(self, table, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class DatabaseWriter(TableWriter):
+    """Inserts each batch with a single executemany on its own transaction.
+
+    With defer_constraints the tables are created with primary keys only,
+    and unique constraints, indexes and foreign keys are added on close.
+    """
+
+    def __init__(self, engine, defer_constraints=False):
+        self.engine = engine
+        self.defer_constraints = defer_constraints
+        self._created = []
+
+    def open(self, tables):
+        """Recreates the tables so every run starts from a clean slate."""
+        metadata = tables[0].metadata
+        metadata.drop_all(self.engine, tables=tables)
+        if self.defer_constraints:
+            constraints.create_tables_deferred(self.engine, tables)
+        else:
+            metadata.create_all(self.engine, tables=tables)
+        self._created = list(tables)
+
+    def write(self, table, rows):
+        if rows:
+            with self.engine.begin() as connection:
+                connection.execute(insert(table), rows)
+
+    def close(self):
+        if self.defer_constraints and self._created:
+            constraints.finalize_tables(self.engine, self._created)
+
+
+# Connect arguments that let each MySQL driver send LOAD DATA LOCAL files.
+LOCAL_INFILE_CONNECT_ARGS = {
+    "mysqlconnector": {"allow_local_infile": True},
+    "pymysql": {"local_infile": True},
+    "mysqldb": {"local_infile": 1},
+}
+
+_TSV_ESCAPES = {
+    b"\\": b"\\\\",
+    b"\t": b"\\t",
+    b"\n": b"\\n",
+    b"\r": b"\\r",
+    b"\0": b"\\0",
+}
+_TSV_SPECIAL = re.compile(rb"[\\\t\n\r\0]")
+
+
+def tsv_field(value):
+    """Encodes one value in LOAD DATA's default tab-separated, backslash-escaped format."""
+    if value is None:
+        return b"\\N"
+    if isinstance(value, bool):
+        return b"1" if value else b"0"
+    if isinstance(value, datetime):
+        value = plain_value(value).isoformat(sep=" ")
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        raw = bytes(value)
+    else:
+        raw = str(value).encode("utf-8")
+    return _TSV_SPECIAL.sub(lambda match: _TSV_ESCAPES[match.group()], raw)
+
+
+class LoadDataWriter(DatabaseWriter):
+    """Bulk-loads MySQL tables with LOAD DATA LOCAL INFILE.
+
+    Batches are appended to one temporary TSV per table. On close the files
+    are loaded in dependency order with foreign_key_checks and unique_checks
+    switched off for the session. Dialects without LOAD DATA fall back to
+    multi-row INSERT statements as the batches arrive.
+    """
+
+    def __init__(self, engine, max_parameters=999, defer_constraints=False):
+        super().__init__(engine, defer_constraints)
+        self.max_parameters = max_parameters
+        self.use_load_data = engine.dialect.name in ("mysql", "mariadb")
+        self._directory = None
+        self._tables = []
+        self._files = {}
+
+    def open(self, tables):
+        super().open(tables)
+        self._tables = list(tables)
+        if self.use_load_data:
+            self._directory = tempfile.mkdtemp(prefix="seed-load-")
+
+    def write(self, table, rows):
+        if not rows:
+            return
+        if not self.use_load_data:
+            self._insert_multi_row(table, rows)
+            return
+        handle = self._files.get(table.name)
+        if handle is None:
+            path = os.path.join(self._directory, f"{table.name}.tsv")
+            handle = self._files[table.name] = open(path, "wb")
+        names = [column.name for column in table.columns]
+        for row in rows:
+            handle.write(b"\t".join(tsv_field(row.get(name)) for name in names))
+            handle.write(b"\n")
+
+    def _insert_multi_row(self, table, rows):
+        per_statement = max(1, self.max_parameters // len(table.columns))
+        with self.engine.begin() as connection:
+            for start in range(0, len(rows), per_statement):
+                connection.execute(insert(table).values(rows[start : start + per_statement]))
+
+    def close(self):
+        if self.use_load_data:
+            self._load_files()
+        super().close()
+
+    def _load_files(self):
+        for handle in self._files.values():
+            handle.close()
+        connect_args = LOCAL_INFILE_CONNECT_ARGS.get(self.engine.dialect.driver, {})
+        load_engine = create_engine(self.engine.url, connect_args=connect_args)
+        try:
+            with load_engine.begin() as connection:
+                connection.exec_driver_sql("SET foreign_key_checks = 0")
+                connection.exec_driver_sql("SET unique_checks = 0")
+                try:
+                    for table in self._tables:
+                        if table.name in self._files:
+                            self._load(connection, table)
+                finally:
+                    connection.exec_driver_sql("SET unique_checks = 1")
+                    connection.exec_driver_sql("SET foreign_key_checks = 1")
+        finally:
+            load_engine.dispose()
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._files = {}
+
+    def _load(self, connection, table):
+        path = os.path.join(self._directory, f"{table.name}.tsv").replace("\\", "/")
+        columns = ", ".join(f"`{column.name}`" for column in table.columns)
+        started = time.perf_counter()
+        connection.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE `{table.name}` "
+            f"CHARACTER SET utf8mb4 ({columns})"
+        )
+        print(f"Loaded {table.name} in {time.perf_counter() - started:.2f}s")
+
+
+class _FileWriter(TableWriter):
+    extension = None
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._files = {}
+
+    def open(self, tables):
+        os.makedirs(self.directory, exist_ok=True)
+        for table in tables:
+            self._file(table)
+
+    def path(self, table):
+        return os.path.join(self.directory, f"{table.name}.{self.extension}")
+
+    def _file(self, table):
+        handle = self._files.get(table.name)
+        if handle is None:
+            handle = self._files[table.name] = open(
+                self.path(table), "w", newline="", encoding="utf-8"
+            )
+            self._start(table, handle)
+        return handle
+
+    def _start(self, table, handle):
+        pass
+
+    def close(self):
+        for handle in self._files.values():
+            handle.close()
+        self._files = {}
+
+
+class CsvWriter(_FileWriter):
+    """One CSV file per table with a header row; NULL is written as an empty field."""
+
+    extension = "csv"
+
+    def _start(self, table, handle):
+        csv.writer(handle).writerow([column.name for column in table.columns])
+
+    def write(self, table, rows):
+        names = [column.name for column in table.columns]
+        writer = csv.writer(self._file(table))
+        for row in rows:
+            values = []
+            for name in names:
+                value = plain_value(row.get(name))
+                if isinstance(value, bool):
+                    value = int(value)
+                elif isinstance(value, datetime):
+                    value = value.isoformat(sep=" ")
+                values.append(value)
+            writer.writerow(values)
+
+
+class JsonLinesWriter(_FileWriter):
+    """One JSON Lines file per table; decimals and dates are written as strings."""
+
+    extension = "jsonl"
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    def write(self, table, rows):
+        names = [column.name for column in table.columns]
+        handle = self._file(table)
+        for row in rows:
+            record = {name: plain_value(row.get(name)) for name in names}
+            handle.write(json.dumps(record, default=self._default))
+            handle.write("\n")
+
+
+def arrow_type(column_type):
+    """Maps a SQLAlchemy column type to the matching Arrow type."""
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.Integer):
+        return pa.int64()
+    if isinstance(column_type, types.Numeric):
+        return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    if isinstance(column_type, BINARY_TYPES):
+        return pa.binary()
+    return pa.string()
+
+
+class ParquetWriter(_FileWriter):
+    """One Parquet file per table, with each batch written as a row group."""
+
+    extension = "parquet"
+
+    def __init__(self, directory):
+        if pa is None:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        super().__init__(directory)
+
+    def _file(self, table):
+        writer = self._files.get(table.name)
+        if writer is None:
+            schema = pa.schema(
+                [(column.name, arrow_type(column.type)) for column in table.columns]
+            )
+            writer = self._files[table.name] = pq.ParquetWriter(self.path(table), schema)
+        return writer
+
+    def write(self, table, rows):
+        writer = self._file(table)
+        arrays = []
+        for column, field in zip(table.columns, writer.schema):
+            values = [row.get(column.name) for row in rows]
+            if isinstance(column.type, types.DateTime):
+                values = [plain_value(v) for v in values]
+            elif isinstance(column.type, BINARY_TYPES):
+                values = [bytes(v) if v is not None else None for v in values]
+            elif isinstance(field.type, pa.Decimal128Type):
+                exponent = Decimal(1).scaleb(-field.type.scale)
+                values = [
+                    Decimal(str(v)).quantize(exponent) if v is not None else None
+                    for v in values
+                ]
+            arrays.append(pa.array(values, type=field.type))
+        writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+
+
+FILE_WRITERS = {
+    "csv": CsvWriter,
+    "jsonl": JsonLinesWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def create_writer(output, directory=None, engine=None, defer_constraints=False):
+    """Returns the writer for an `output` setting: database, load, async, csv, jsonl or parquet."""
+    if output == "database":
+        return DatabaseWriter(engine, defer_constraints=defer_constraints)
+    if output == "load":
+        return LoadDataWriter(engine, defer_constraints=defer_constraints)
+    if output == "async":
+        from async_writer import AsyncDatabaseWriter
+        from config import ASYNC_QUEUE_SIZE, ASYNC_WRITERS
+
+        return AsyncDatabaseWriter(
+            engine, ASYNC_WRITERS, ASYNC_QUEUE_SIZE, defer_constraints=defer_constraints
+        )
+    try:
+        return FILE_WRITERS[output](directory)
+    except KeyError:
+        raise ValueError(
+            f"Unknown output '{output}'; expected database, load, async, "
+            f"{', '.join(FILE_WRITERS)}."
+        )